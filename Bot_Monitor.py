@@ -1,7 +1,14 @@
 import streamlit as st
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import numpy as np
 import pandas as pd
+from datetime import datetime, timedelta
+
+import metrics
+import reasons
+import sheets
+from aggregates import RunSummary
+from poller import get_poller
+from ticket_index import TicketIndex
 
 st.set_page_config(
     page_title="Bot Monitoring",
@@ -9,43 +16,13 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded"
 )
+metrics.start_run("Bot Monitor")
 
-# ใช้ Secrets โดยตรงจาก Streamlit
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-credentials_dict = {
-    "type": st.secrets["GOOGLE_SHEETS"]["type"],
-    "project_id": st.secrets["GOOGLE_SHEETS"]["project_id"],
-    "private_key_id": st.secrets["GOOGLE_SHEETS"]["private_key_id"],
-    "private_key": st.secrets["GOOGLE_SHEETS"]["private_key"],
-    "client_email": st.secrets["GOOGLE_SHEETS"]["client_email"],
-    "client_id": st.secrets["GOOGLE_SHEETS"]["client_id"],
-    "auth_uri": st.secrets["GOOGLE_SHEETS"]["auth_uri"],
-    "token_uri": st.secrets["GOOGLE_SHEETS"]["token_uri"],
-    "auth_provider_x509_cert_url": st.secrets["GOOGLE_SHEETS"]["auth_provider_x509_cert_url"],
-    "client_x509_cert_url": st.secrets["GOOGLE_SHEETS"]["client_x509_cert_url"]
-}  # ไม่ต้องใช้ json.loads
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict, scope)
-gc = gspread.authorize(credentials)
-#sh = gc.open_by_key('--- google sheet key ---')
-sh = gc.open_by_key(st.secrets["GOOGLE_SHEETS"]["google_sheet_key"])
-notification_sheet = sh.worksheet("Notification")
-notification_data = notification_sheet.get_all_records()
-df_notification = pd.DataFrame(notification_data)
-
-# Fetch data from "Logdata" sheet
-logdata_sheet = sh.worksheet("Logdata")
-logdata_data = logdata_sheet.get_all_records()
-df_logdata = pd.DataFrame(logdata_data)
-
-def set_reason(row):
-    if row['RPA_Delete'] == 'No':
-        return 'ไม่เข้าเงื่อนไขที่ Bot ทำงาน ให้ Supervisor ตรวจสอบ'
-    elif row['RPA_Delete'] == 'Yes':
-        if row['RPA_SendSMS'] == 'No':
-            return 'Bot ทำการลบรายการใน e-service แล้ว แต่ยังไม่ได้ดำเนินการในขั้นตอนส่ง SMS และ VOC'
-        elif row['RPA_SendSMS'] == 'Yes':
-            return 'Bot ทำการลบรายการและส่ง sms เรียบร้อย เหลือขั้นตอน SendVOC ที่ยังไม่ได้ดำเนินการ'
-    return ''
+# Background pollers, one per bot, keep "Notification" and "Logdata" fresh for every session
+sheets.refresh_button()
+bot_names = sheets.bot_sources()
+bots = sheets.select_bots()
+pollers = {bot: get_poller(bot) for bot in bots}
 
 def highlight_time(s,start):
     return ['background-color: rgb(234, 226, 73); color: #000000;' if s['RPA_Starttime'] == start else '' for _ in s]
@@ -65,49 +42,90 @@ def display_card(title, value):
     """
     st.markdown(html, unsafe_allow_html=True)
 
-# Display the latest notification
-if not df_notification.empty:
-    last_record = df_notification.iloc[-1]  # Get the last row of the Notification DataFrame
-    notification = last_record.get('Notification', 'No notification available')  # Replace 'Notification' with the actual column name
-    startdate = last_record.get('RPA_Startdate')
-    starttime = last_record.get('RPA_Starttime')
+def show_bot(bot, poller):
+    # Latest run of one bot; returns today's bot working cases
+    df_notification = sheets.load_sheet("Notification", ttl=poller.stale_after, bot=bot)
+    runs = sheets.load_view("Logdata", RunSummary, ttl=poller.stale_after, bot=bot)
+    index, logdata = sheets.load_view_rows("Logdata", TicketIndex, ttl=poller.stale_after, bot=bot)
+    total_bot_cases = 0
+    if poller.updated_at is not None:
+        st.caption(f"Last checked {datetime.fromtimestamp(poller.updated_at):%H:%M:%S}")
+    if poller.error is not None:
+        st.warning(f"Checking Google Sheets for new runs failed, retrying every {poller.interval}s. ({poller.error})")
+
+    # Display the latest notification
+    if not df_notification.empty:
+        last_record = df_notification.iloc[-1]  # Get the last row of the Notification DataFrame
+        notification = last_record.get('Notification', 'No notification available')  # Replace 'Notification' with the actual column name
+        startdate = last_record.get('RPA_Startdate')
+        starttime = last_record.get('RPA_Starttime')
+
+        # Counted per run as rows arrive, no scan of Logdata here
+        total_bot_cases = runs.day_totals(startdate)['Success']
+        display_card("Today Bot Working Cases", total_bot_cases)
+        #display_card("จำนวน Case ที่ Bot ทำงานในวันนี้", total_bot_cases)
+        # Display the notification
+        st.markdown("------------------------")
+        st.markdown("##### 📢 Notification Lastest")
+        #st.markdown("##### Notification Lastest")
+        #st.markdown(f"```\n{notification}\n```")
+        st.code(notification, language='text')
+        st.write("------------------------")
+        # Filter Logdata for relevant entries
+        if len(index):
+            # Only the rows of today's runs, located through the run start index,
+            # plus the rows whose start time is blank; both in sheet order
+            with metrics.span("monitor.failed_cases"):
+                day = pd.to_datetime(startdate, errors='coerce', format='mixed')
+                if pd.isna(day):
+                    df_logdata = logdata
+                else:
+                    day = day.normalize()
+                    df_logdata = logdata.iloc[np.sort(np.concatenate([
+                        index.between(day, day + timedelta(days=1)), index.undated()
+                    ]))]
+                relevant_logs = reasons.failed_cases(df_logdata, startdate)
+            if not relevant_logs.empty:
+                relevant_logs = relevant_logs.reset_index(drop=True)
+                relevant_logs = relevant_logs[::-1] 
+                styled_logs = relevant_logs.style.apply(highlight_time, axis=1, args=(starttime,))
+                #styled_logs = relevant_logs.style.apply(highlight_time, axis=1)
+                #st.markdown("### Relevant Logs from Logdata Sheet")
+                #st.markdown("##### ⚠️ รายละเอียด Case ที่ Supervisor ต้องตรวจสอบ")
+                st.markdown("<h4>⚠️ Case Detail for Supervisor Checking</h4>", unsafe_allow_html=True)
+                #st.dataframe(relevant_logs.reset_index(drop=True)) 
+                st.dataframe(styled_logs) 
+            else:
+                st.info("Bot ทำงานสำเร็จทุกเคสในรอบเวลานี้ ไม่มีรายการคงเหลือ")
+    else:
+        st.warning("No data available in the Notification sheet.")
+    return total_bot_cases
+
+@st.fragment(run_every=min(poller.interval for poller in pollers.values()))
+def show_latest_run():
+    # Reruns on its own every poll interval and reads only the shared caches;
+    # every bot's sheets are synced at the same time
+    stale_after = max(poller.stale_after for poller in pollers.values())
+    loaded = sheets.sync_fleet(["Notification", "Logdata"], bots, ttl=stale_after)
+    shown = [bot for bot in bots if bot in loaded]
+    if len(shown) == 1:
+        show_bot(shown[0], pollers[shown[0]])
+        return
+
+    # Fleet overview above one tab per bot
+    overview = st.container()
+    totals = {}
+    for bot, tab in zip(shown, st.tabs([bot_names[bot] for bot in shown])):
+        with tab:
+            totals[bot] = show_bot(bot, pollers[bot])
+    with overview:
+        columns = st.columns(len(shown) + 1)
+        with columns[0]:
+            display_card("Fleet Today Bot Working Cases", sum(totals.values()))
+        for column, bot in zip(columns[1:], shown):
+            with column:
+                display_card(bot_names[bot], totals[bot])
 
-    total_bot_cases = len(df_logdata[(df_logdata['RPA_Result'] == 'Yes') & (df_logdata['RPA_Startdate'] == startdate)])
-    display_card("Today Bot Working Cases", total_bot_cases)
-    #display_card("จำนวน Case ที่ Bot ทำงานในวันนี้", total_bot_cases)
-    # Display the notification
-    st.markdown("------------------------")
-    st.markdown("##### 📢 Notification Lastest")
-    #st.markdown("##### Notification Lastest")
-    #st.markdown(f"```\n{notification}\n```")
-    st.code(notification, language='text')
-    st.write("------------------------")
-    # Filter Logdata for relevant entries
-    if not df_logdata.empty:
-        # Example: Filter Logdata for rows matching a specific column value
-        # Here, we're assuming the "Subject / Description" or another column in Logdata can be matched to the Notification
-        relevant_logs = df_logdata[['Ticket No.','RPA_Delete','RPA_SendSMS','RPA_SendVOC',
-                                               'RPA_Result','RPA_Startdate','RPA_Starttime']]
-        relevant_logs = relevant_logs[(relevant_logs['RPA_Result'] == 'No') & 
-                                      (relevant_logs['RPA_Startdate'] == startdate)]
-        
-        #relevant_logs = relevant_logs[(relevant_logs['RPA_Result'] == 'No') & 
-        #                              (relevant_logs['RPA_Startdate'] == '2024-12-13 0:00:00') &
-        #                              (relevant_logs['RPA_Starttime'] == '21:39')]
-        relevant_logs['Reason'] =  relevant_logs.apply(set_reason, axis=1)
-        relevant_logs = relevant_logs[['Ticket No.','RPA_Startdate','RPA_Starttime','Reason','RPA_Delete',
-                                       'RPA_SendSMS','RPA_SendVOC','RPA_Result']]
-        if not relevant_logs.empty:
-            relevant_logs = relevant_logs.reset_index(drop=True)
-            relevant_logs = relevant_logs[::-1] 
-            styled_logs = relevant_logs.style.apply(highlight_time, axis=1, args=(starttime,))
-            #styled_logs = relevant_logs.style.apply(highlight_time, axis=1)
-            #st.markdown("### Relevant Logs from Logdata Sheet")
-            #st.markdown("##### ⚠️ รายละเอียด Case ที่ Supervisor ต้องตรวจสอบ")
-            st.markdown("<h4>⚠️ Case Detail for Supervisor Checking</h4>", unsafe_allow_html=True)
-            #st.dataframe(relevant_logs.reset_index(drop=True)) 
-            st.dataframe(styled_logs) 
-        else:
-            st.info("Bot ทำงานสำเร็จทุกเคสในรอบเวลานี้ ไม่มีรายการคงเหลือ")
-else:
-    st.warning("No data available in the Notification sheet.")
+show_latest_run()
+sheets.data_status("Notification", "Logdata", bots=bots)
+metrics.perf_panel()
@@ -0,0 +1,296 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+# Case counts pre-aggregated at the finest grain the pages use:
+# date x 15-minute slot x responder. Cards, charts and report tables are
+# sliced from these arrays, so a filter change costs O(buckets) instead of a
+# groupby over every raw row. Slot n covers HH:MM = n * 15 minutes.
+
+SLOTS_PER_DAY = 96
+SLOT_MINUTES = 15
+SLOT_LABELS = np.array([f"{slot // 4:02d}:{slot % 4 * SLOT_MINUTES:02d}" for slot in range(SLOTS_PER_DAY)])
+SLOTS_PER_HOUR = 60 // SLOT_MINUTES
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+# Data versions are unique per process, so a rebuilt cube never reuses one
+_versions = itertools.count(1)
+
+
+def slot_of(created):
+    return (created.dt.hour * 4 + created.dt.minute // SLOT_MINUTES).to_numpy()
+
+
+def weekday_of(days):
+    # 1970-01-01 was a Thursday; Monday = 0 like datetime.weekday()
+    return (days.astype('datetime64[D]').astype(np.int64) + 3) % 7
+
+
+def slot_start(days, slots):
+    return days.astype('datetime64[m]') + np.asarray(slots) * np.timedelta64(SLOT_MINUTES, 'm')
+
+
+def _responder_order(responders):
+    # Known responders first (Bot, Supervisor), then any others sorted, so the
+    # columns do not depend on which responder the sheet happens to start with
+    known = [responder for responder in schema.RESPONDERS if responder in responders]
+    return tuple(known + sorted(set(responders) - set(schema.RESPONDERS), key=str))
+
+
+def _regrid(state, dates, responders):
+    # Counts of state on a (usually larger) set of dates and responders
+    old_dates, old_responders, counts = state
+    grid = np.zeros((len(dates), SLOTS_PER_DAY, len(responders)), dtype=np.int32)
+    rows = np.searchsorted(dates, old_dates)
+    for index, responder in enumerate(old_responders):
+        grid[rows, :, responders.index(responder)] += counts[:, :, index]
+    return grid
+
+
+def _empty_cube():
+    return np.array([], dtype='datetime64[D]'), (), np.zeros((0, SLOTS_PER_DAY, 0), dtype=np.int32)
+
+
+class IntervalCube:
+    """Counts per (date, 15-minute slot, responder), kept as an int32 array.
+
+    Built once from the full sheet (`rebuild`) and updated with `add` as the
+    incremental sync brings in new rows. Saved next to the sheet snapshot
+    (`to_arrays`/`from_arrays`) so a restart does not rebuild it. Daily,
+    hourly and weekday rollups are sums over its axes.
+    """
+
+    def __init__(self, date_column='Created', responder_column='Response'):
+        self.date_column = date_column
+        self.responder_column = responder_column
+        # Swapped as one tuple so readers never see dates and counts out of step
+        self._state = _empty_cube()
+        self.version = next(_versions)
+
+    def rebuild(self, frame):
+        # Built aside and published once: readers keep the old counts meanwhile
+        self._state = self._added(_empty_cube(), frame)
+        self.version = next(_versions)
+
+    def add(self, frame):
+        self._state = self._added(self._state, frame)
+        self.version = next(_versions)
+
+    def _added(self, state, frame):
+        created = frame[self.date_column]
+        valid = created.notna().to_numpy()
+        if not valid.any():
+            return state
+        created = created[valid]
+        days = created.to_numpy().astype('datetime64[D]')
+        # Use the slot parsed at ingest time when the schema provides it
+        slots = frame['Slot'].to_numpy()[valid].astype(np.intp) if 'Slot' in frame else slot_of(created)
+        responder_values = frame[self.responder_column].to_numpy()[valid]
+
+        responders = _responder_order(set(state[1]) | set(pd.unique(responder_values)))
+        new_dates = np.union1d(state[0], days)
+        grown = _regrid(state, new_dates, responders)
+
+        responder_index = pd.Index(responders).get_indexer(responder_values)
+        np.add.at(grown, (np.searchsorted(new_dates, days), slots, responder_index), 1)
+        return new_dates, responders, grown
+
+    def to_arrays(self):
+        dates, responders, counts = self._state
+        return {"dates": dates, "responders": np.array(responders, dtype=str), "counts": counts}
+
+    def from_arrays(self, arrays):
+        state = (
+            arrays["dates"].astype('datetime64[D]'), tuple(arrays["responders"].tolist()),
+            arrays["counts"].astype(np.int32),
+        )
+        responders = _responder_order(state[1])
+        self._state = (state[0], responders, _regrid(state, state[0], responders))
+        self.version = next(_versions)
+
+    @classmethod
+    def merge(cls, cubes):
+        # Summed counts of several cubes (one per bot)
+        states = [cube._state for cube in cubes]
+        dates = np.unique(np.concatenate([np.array([], dtype='datetime64[D]')] + [state[0] for state in states]))
+        responders = _responder_order({responder for state in states for responder in state[1]})
+        counts = np.zeros((len(dates), SLOTS_PER_DAY, len(responders)), dtype=np.int32)
+        for state in states:
+            counts += _regrid(state, dates, responders)
+        merged = cls()
+        merged._state = (dates, responders, counts)
+        return merged
+
+    @property
+    def responders(self):
+        return list(self._state[1])
+
+    def dates(self):
+        return [day.item() for day in self._state[0]]
+
+    def select(self, start=None, end=None, exclude_dates=(), exclude_weekdays=()):
+        dates, responders, counts = self._state
+        mask = np.ones(len(dates), dtype=bool)
+        if start is not None:
+            mask &= dates >= np.datetime64(start, 'D')
+        if end is not None:
+            mask &= dates <= np.datetime64(end, 'D')
+        if len(exclude_dates):
+            mask &= ~np.isin(dates, np.array(list(exclude_dates), dtype='datetime64[D]'))
+        if len(exclude_weekdays):
+            mask &= ~np.isin(weekday_of(dates), list(exclude_weekdays))
+        return dates[mask], list(responders), counts[mask]
+
+    def totals(self, **filters):
+        _, responders, counts = self.select(**filters)
+        per_responder = counts.sum(axis=(0, 1))
+        return {responder: int(count) for responder, count in zip(responders, per_responder)}
+
+    def interval_table(self, **filters):
+        # Wide table of the non-empty buckets: Date, Slot, one column per responder
+        dates, responders, counts = self.select(**filters)
+        day_index, slots = np.nonzero(counts.sum(axis=2))
+        table = pd.DataFrame(counts[day_index, slots], columns=responders)
+        table.insert(0, 'Date', [day.item() for day in dates[day_index]])
+        table.insert(1, 'Slot', slots)
+        return table
+
+    def interval_counts(self, **filters):
+        # Long table of the non-empty cells: TimeInterval, Response, Count
+        dates, responders, counts = self.select(**filters)
+        day_index, slots, responder_index = np.nonzero(counts)
+        return pd.DataFrame({
+            'TimeInterval': slot_start(dates[day_index], slots),
+            'Response': np.asarray(responders, dtype=object)[responder_index],
+            'Count': counts[day_index, slots, responder_index],
+        })
+
+    def daily(self, **filters):
+        # One row per date: Date, Weekday, one column per responder
+        dates, responders, counts = self.select(**filters)
+        table = pd.DataFrame(counts.sum(axis=1), columns=responders)
+        table.insert(0, 'Date', [day.item() for day in dates])
+        table.insert(1, 'Weekday', weekday_of(dates))
+        return table
+
+    def hourly(self, **filters):
+        # Counts per date x hour of day x responder
+        dates, responders, counts = self.select(**filters)
+        return dates, responders, counts.reshape(len(dates), -1, SLOTS_PER_HOUR, len(responders)).sum(axis=2)
+
+    def weekday_slots(self, **filters):
+        # Mean cases per weekday x slot x responder over the selected dates
+        # with cases, and the number of such dates for each weekday
+        dates, responders, counts = self.select(**filters)
+        weekdays = weekday_of(dates)
+        totals = np.zeros((7, SLOTS_PER_DAY, len(responders)), dtype=np.int64)
+        np.add.at(totals, weekdays, counts)
+        days = np.bincount(weekdays, minlength=7)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = totals / days[:, None, None]
+        return responders, np.nan_to_num(means), days
+
+    def timeline(self, **filters):
+        # All responders together per 15-minute bucket, non-empty buckets only
+        dates, _, counts = self.select(**filters)
+        per_slot = counts.sum(axis=2)
+        day_index, slots = np.nonzero(per_slot)
+        return pd.DataFrame({
+            'TimeInterval': slot_start(dates[day_index], slots),
+            'Count': per_slot[day_index, slots],
+        })
+
+
+def interval_summary(cube, start_date, end_date, exclude_dates=(), exclude_weekdays=()):
+    # Report table: every 15-minute slot of every date in the range, integer
+    # counts only. 'HH:MM' labels and '% Bot Working' are added when the table
+    # is rendered or exported.
+    interval_grouped = cube.interval_table(
+        start=start_date, end=end_date, exclude_dates=exclude_dates, exclude_weekdays=exclude_weekdays
+    ).set_index(['Date', 'Slot'])
+    all_periods = pd.MultiIndex.from_product(
+        [pd.date_range(start_date, end_date).date, np.arange(SLOTS_PER_DAY)], names=['Date', 'Slot']
+    )
+    summary_report = interval_grouped.reindex(all_periods, fill_value=0)
+    summary_report['Total Case'] = summary_report.sum(axis=1)
+    summary_report['Bot Working Case'] = summary_report['Bot'] if 'Bot' in summary_report else 0
+    summary_report['Supervisor Working Case'] = (
+        summary_report['Supervisor'] if 'Supervisor' in summary_report else 0
+    )
+    return summary_report.reset_index()
+
+
+RUN_KEYS = ['RPA_Startdate', 'RPA_Starttime']
+# Count column -> (Logdata column, value counted); None counts every case
+RUN_COUNTS = {
+    'Cases': None,
+    'Success': ('RPA_Result', 'Yes'),
+    'Failed': ('RPA_Result', 'No'),
+    'Deleted': ('RPA_Delete', 'Yes'),
+    'SMS Sent': ('RPA_SendSMS', 'Yes'),
+    'VOC Sent': ('RPA_SendVOC', 'Yes'),
+}
+
+
+class RunSummary:
+    """Case and step counts per bot run, keyed on (RPA_Startdate, RPA_Starttime).
+
+    Built from the full "Logdata" sheet (`rebuild`) and updated with `add`
+    as new rows arrive; the table has one row per run, so it stays small.
+    """
+
+    def __init__(self):
+        self.table = self._count(pd.DataFrame(columns=RUN_KEYS))
+        self.version = next(_versions)
+
+    @staticmethod
+    def _count(frame):
+        counts = pd.DataFrame(
+            {
+                name: np.ones(len(frame), dtype=np.int64) if rule is None
+                else (frame[rule[0]] == rule[1]).to_numpy(dtype=np.int64)
+                for name, rule in RUN_COUNTS.items()
+                if rule is None or rule[0] in frame
+            },
+            index=frame.index,
+        )
+        counts = counts.groupby([frame[key] for key in RUN_KEYS], observed=True).sum().reset_index()
+        # Plain string keys, so runs from different batches line up
+        counts[RUN_KEYS] = counts[RUN_KEYS].astype(str)
+        return counts.set_index(RUN_KEYS).reindex(columns=list(RUN_COUNTS), fill_value=0)
+
+    @classmethod
+    def merge(cls, summaries):
+        # Summed counts of several summaries (one per bot)
+        merged = cls()
+        for summary in summaries:
+            merged.table = merged.table.add(summary.table, fill_value=0).astype(np.int64)
+        return merged
+
+    def rebuild(self, frame):
+        self.table = self._count(frame)
+        self.version = next(_versions)
+
+    def add(self, frame):
+        if len(frame):
+            self.table = self.table.add(self._count(frame), fill_value=0).astype(np.int64)
+            self.version = next(_versions)
+
+    def runs(self, start=None, end=None):
+        # One row per run with its start time, oldest first, for runs started in [start, end)
+        table = self.table.reset_index()
+        table.insert(0, 'Run Start', schema.run_start(table).to_numpy())
+        if start is not None:
+            table = table[table['Run Start'] >= pd.Timestamp(start)]
+        if end is not None:
+            table = table[table['Run Start'] < pd.Timestamp(end)]
+        return table.sort_values('Run Start', kind='stable').reset_index(drop=True)
+
+    def day_totals(self, startdate):
+        # Counts over every run of one RPA_Startdate
+        if startdate not in self.table.index.get_level_values(0):
+            return dict.fromkeys(RUN_COUNTS, 0)
+        return {name: int(count) for name, count in self.table.loc[startdate].sum().items()}
@@ -0,0 +1,77 @@
+import re
+from collections import Counter
+
+from gspread.utils import a1_to_rowcol
+
+# In-process stand-in for the parts of gspread the app uses, serving a
+# list-of-lists per worksheet. Counts calls and cells so benchmarks can report
+# API cost as well as time.
+
+_ROWS = re.compile(r"^(\d+):(\d+)$")
+_CELLS = re.compile(r"^([A-Z]+)(\d+):([A-Z]+)(\d*)$")
+
+
+class FakeWorksheet:
+    def __init__(self, title, values, stats=None):
+        self.title = title
+        self.values = values
+        self.stats = stats if stats is not None else Counter()
+
+    def _count(self, call, rows):
+        self.stats[call] += 1
+        self.stats["cells"] += sum(len(row) for row in rows)
+        return rows
+
+    def _range(self, name):
+        name = name.split("!")[-1]
+        match = _ROWS.match(name)
+        if match:
+            first, last = int(match.group(1)), int(match.group(2))
+            return [list(row) for row in self.values[first - 1:last]]
+        match = _CELLS.match(name)
+        if not match:
+            raise ValueError(f"Unsupported range: {name}")
+        first_row, first_col = a1_to_rowcol(f"{match.group(1)}{match.group(2)}")
+        last_col = a1_to_rowcol(f"{match.group(3)}1")[1]
+        last_row = int(match.group(4)) if match.group(4) else len(self.values)
+        return [list(row[first_col - 1:last_col]) for row in self.values[first_row - 1:last_row]]
+
+    def get_all_records(self):
+        header, rows = self.values[0], self.values[1:]
+        self._count("get_all_records", self.values)
+        return [dict(zip(header, row)) for row in rows]
+
+    def get_values(self, range_name=None):
+        rows = self._range(range_name) if range_name else [list(row) for row in self.values]
+        return self._count("get_values", rows)
+
+    def batch_get(self, ranges):
+        results = [self._range(name) for name in ranges]
+        self._count("batch_get", [row for result in results for row in result])
+        return results
+
+    def append_rows(self, rows):
+        self.values.extend(list(row) for row in rows)
+
+
+class FakeSpreadsheet:
+    def __init__(self, worksheets):
+        self.stats = Counter()
+        self._worksheets = {
+            title: FakeWorksheet(title, values, self.stats) for title, values in worksheets.items()
+        }
+
+    def values_batch_get(self, ranges, params=None):
+        self.stats["values_batch_get"] += 1
+        value_ranges = []
+        for name in ranges:
+            title, _, cells = name.partition("!")
+            sheet = self._worksheets[title.strip("'").replace("''", "'")]
+            rows = sheet._range(cells) if cells else [list(row) for row in sheet.values]
+            self.stats["cells"] += sum(len(row) for row in rows)
+            value_ranges.append({"range": name, "values": rows} if rows else {"range": name})
+        return {"valueRanges": value_ranges}
+
+    def worksheet(self, title):
+        self.stats["worksheet"] += 1
+        return self._worksheets[title]
@@ -0,0 +1,213 @@
+"""Headless benchmarks for the data paths behind the three pages.
+
+    python -m benchmarks.run                      # realistic sizes
+    python -m benchmarks.run --preset stress      # 1M and 5M rows
+    python -m benchmarks.run --sizes 50000 --output results.json
+    python -m benchmarks.run --compare before.json after.json
+
+Worksheets are synthetic and served by an in-process fake of gspread, so no
+network access or credentials are needed.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+import charts
+import reasons
+import sheets
+from aggregates import IntervalCube, RunSummary, interval_summary
+from benchmarks import synthetic
+from benchmarks.fake_sheets import FakeSpreadsheet
+from excel_export import create_excel_download
+from ticket_index import TicketIndex
+
+PRESETS = {
+    "realistic": [10_000, 100_000],
+    "stress": [1_000_000, 5_000_000],
+}
+APPENDED_ROWS = 200
+
+
+def timed(fn, repeat, setup=None):
+    times = []
+    result = None
+    for _ in range(repeat):
+        state = setup() if setup is not None else None
+        start = time.perf_counter()
+        result = fn(state) if setup is not None else fn()
+        times.append(time.perf_counter() - start)
+    return {"min": min(times), "mean": statistics.fmean(times), "repeat": repeat}, result
+
+
+def _new_cache(spreadsheet, snapshot_dir=None):
+    return sheets.WorksheetCache(spreadsheet, ttl=0, snapshot_dir=snapshot_dir)
+
+
+def bench_size(rows, repeat):
+    values = synthetic.workbook(rows)
+    results = []
+
+    def record(name, timing, spreadsheet=None, **extra):
+        entry = {"name": name, "rows": rows, **timing, **extra}
+        if spreadsheet is not None:
+            entry["api"] = dict(spreadsheet.stats)
+        results.append(entry)
+        print(f"{name:<32} {rows:>9,} rows  {timing['min'] * 1000:10.1f} ms", file=sys.stderr)
+
+    # Google Sheets sync paths
+    def full_sync_setup():
+        return _new_cache(FakeSpreadsheet(values))
+
+    timing, _ = timed(lambda cache: cache.refresh("Daily"), repeat, full_sync_setup)
+    record("sheets.daily_full_sync", timing)
+
+    def incremental_setup():
+        spreadsheet = FakeSpreadsheet({"Daily": [list(row) for row in values["Daily"]]})
+        cache = _new_cache(spreadsheet)
+        cache.refresh("Daily")
+        tail = synthetic.daily_values(APPENDED_ROWS, seed=rows)[1:]
+        spreadsheet.worksheet("Daily").append_rows(tail)
+        spreadsheet.stats.clear()
+        return cache, spreadsheet
+
+    timing, (_, spreadsheet) = timed(
+        lambda state: (state[0].refresh("Daily"), state[1]), repeat, incremental_setup
+    )
+    record("sheets.daily_incremental_sync", timing, spreadsheet, appended=APPENDED_ROWS)
+
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        _new_cache(FakeSpreadsheet(values), snapshot_dir).refresh("Daily")
+
+        def restore_setup():
+            spreadsheet = FakeSpreadsheet(values)
+            return _new_cache(spreadsheet, snapshot_dir), spreadsheet
+
+        timing, (_, spreadsheet) = timed(
+            lambda state: (state[0].refresh("Daily"), state[1]), repeat, restore_setup
+        )
+        record("snapshot.restore_daily", timing, spreadsheet)
+
+    # Dashboard / Report aggregates
+    cache = _new_cache(FakeSpreadsheet(values))
+    daily = cache.refresh("Daily")
+    cube = cache.incremental("Daily").views[IntervalCube]
+    timing, _ = timed(lambda: IntervalCube().rebuild(daily), repeat)
+    record("aggregates.cube_build", timing)
+
+    last_day = cube.dates()[-1]
+    week_start = last_day - timedelta(days=6)
+
+    def dashboard():
+        filters = dict(start=week_start, end=last_day, exclude_dates=[])
+        cube.totals(**filters)
+        cube.interval_counts(**filters)
+        charts.downsample_timeline(cube.timeline())
+
+    timing, _ = timed(dashboard, repeat)
+    record("dashboard.week_view", timing)
+
+    def capacity():
+        filters = dict(start=cube.dates()[0], end=last_day, exclude_weekdays=[5, 6])
+        cube.weekday_slots(**filters)
+        cube.hourly(**filters)
+        cube.daily(**filters)
+
+    timing, _ = timed(capacity, repeat)
+    record("capacity.rollups", timing)
+
+    for days in (10, 90):
+        start = max(cube.dates()[0], last_day - timedelta(days=days - 1))
+        timing, summary = timed(lambda: interval_summary(cube, start, last_day, [], [5, 6]), repeat)
+        record(f"report.interval_summary_{days}d", timing, intervals=len(summary))
+        timing, workbook = timed(lambda: create_excel_download(summary), repeat)
+        record(f"report.excel_export_{days}d", timing, bytes=len(workbook.getvalue()))
+
+    # Bot Monitor
+    def monitor_setup():
+        spreadsheet = FakeSpreadsheet(values)
+        return _new_cache(spreadsheet), spreadsheet
+
+    timing, (frames, spreadsheet) = timed(
+        lambda state: (state[0].refresh_many(["Notification", "Logdata"]), state[1]), repeat, monitor_setup
+    )
+    record("monitor.batched_fetch", timing, spreadsheet)
+    logdata, notification = frames["Logdata"], frames["Notification"]
+    startdate = notification.iloc[-1]['RPA_Startdate']
+    timing, failed = timed(lambda: reasons.failed_cases(logdata, startdate), repeat)
+    record("monitor.failed_cases", timing, failed=len(failed))
+    timing, _ = timed(lambda: RunSummary().rebuild(logdata), repeat)
+    record("monitor.run_summary_build", timing)
+    runs = RunSummary()
+    runs.rebuild(logdata)
+    timing, _ = timed(lambda: runs.day_totals(startdate), repeat)
+    record("monitor.today_card", timing)
+
+    # Ticket search
+    timing, _ = timed(lambda: TicketIndex().rebuild(logdata), repeat)
+    record("tickets.index_build", timing)
+    index = TicketIndex()
+    index.rebuild(logdata)
+    ticket = logdata['Ticket No.'].iloc[len(logdata) // 2]
+    timing, history = timed(lambda: logdata.iloc[index.positions(ticket)], repeat)
+    record("tickets.lookup", timing, found=len(history))
+    return results
+
+
+def run(sizes, repeat):
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "repeat": repeat,
+        },
+        "results": [result for rows in sizes for result in bench_size(rows, repeat)],
+    }
+
+
+def compare(before_path, after_path):
+    with open(before_path, encoding="utf-8") as f:
+        before = {(r["name"], r["rows"]): r for r in json.load(f)["results"]}
+    with open(after_path, encoding="utf-8") as f:
+        after = json.load(f)["results"]
+    for result in after:
+        key = (result["name"], result["rows"])
+        if key in before:
+            ratio = result["min"] / before[key]["min"] if before[key]["min"] else float("nan")
+            print(f"{result['name']:<32} {result['rows']:>9,}  "
+                  f"{before[key]['min'] * 1000:10.1f} ms -> {result['min'] * 1000:10.1f} ms  x{ratio:.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--preset", choices=PRESETS, default="realistic")
+    parser.add_argument("--sizes", type=int, nargs="+", help="row counts, overrides --preset")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="write JSON results here instead of stdout")
+    parser.add_argument("--compare", nargs=2, metavar=("BEFORE", "AFTER"), help="compare two result files")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    results = run(args.sizes or PRESETS[args.preset], args.repeat)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+
+from schema import CREATED_FORMAT
+
+# Synthetic worksheets shaped like the bot's "Daily", "Logdata" and
+# "Notification" sheets, as the list-of-lists values the Sheets API returns.
+
+DAILY_HEADER = ['Ticket No.', 'Created', 'Response']
+LOGDATA_HEADER = ['Ticket No.', 'RPA_Delete', 'RPA_SendSMS', 'RPA_SendVOC',
+                  'RPA_Result', 'RPA_Startdate', 'RPA_Starttime']
+NOTIFICATION_HEADER = ['Notification', 'RPA_Startdate', 'RPA_Starttime']
+
+CASES_PER_DAY = 600
+RUNS_PER_DAY = 4
+START = pd.Timestamp("2024-01-01")
+
+
+def daily_values(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    days = max(1, rows // CASES_PER_DAY)
+    offsets = np.sort(rng.integers(0, days * 86400, rows))
+    created = (START + pd.to_timedelta(offsets, unit='s')).strftime(CREATED_FORMAT)
+    response = np.where(rng.random(rows) < 0.7, 'Bot', 'Supervisor')
+    tickets = (10_000_000 + np.arange(rows)).astype(str)
+    return [DAILY_HEADER] + np.column_stack([tickets, np.asarray(created), response]).tolist()
+
+
+def _runs(rows):
+    days = max(1, rows // CASES_PER_DAY)
+    run_index = np.arange(days * RUNS_PER_DAY)
+    run_days = START + pd.to_timedelta(run_index // RUNS_PER_DAY, unit='D')
+    run_dates = np.asarray(run_days.strftime('%Y-%m-%d 0:00:00'))
+    run_times = np.asarray([f"{8 + 4 * (i % RUNS_PER_DAY):02d}:{i % 60:02d}" for i in run_index])
+    return run_dates, run_times
+
+
+def logdata_values(rows, seed=1):
+    rng = np.random.default_rng(seed)
+    run_dates, run_times = _runs(rows)
+    run = np.sort(rng.integers(0, len(run_dates), rows))
+    delete = rng.random(rows) < 0.9
+    sms = delete & (rng.random(rows) < 0.95)
+    voc = sms & (rng.random(rows) < 0.95)
+    flags = [np.where(step, 'Yes', 'No') for step in (delete, sms, voc, voc)]
+    tickets = (10_000_000 + rng.permutation(rows)).astype(str)
+    columns = [tickets, *flags, run_dates[run], run_times[run]]
+    return [LOGDATA_HEADER] + np.column_stack(columns).tolist()
+
+
+def notification_values(rows):
+    run_dates, run_times = _runs(rows)
+    return [NOTIFICATION_HEADER] + [
+        [f"Bot run {date[:10]} {time} finished", date, time]
+        for date, time in zip(run_dates, run_times)
+    ]
+
+
+def workbook(rows, seed=0):
+    return {
+        "Daily": daily_values(rows, seed),
+        "Logdata": logdata_values(rows, seed + 1),
+        "Notification": notification_values(rows),
+    }
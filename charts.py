@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+
+# Keeps the all-history time-series chart bounded: counts are rolled up to the
+# finest resolution that fits the point budget, and whatever is still over
+# budget is thinned with LTTB (largest triangle three buckets), which keeps
+# the peaks and dips that matter visually.
+
+MAX_POINTS = 1500  # about one point per pixel of a wide chart
+RESOLUTIONS = [
+    ("15min", "15 minutes", pd.Timedelta(minutes=15)),
+    ("h", "hourly", pd.Timedelta(hours=1)),
+    ("D", "daily", pd.Timedelta(days=1)),
+    ("W", "weekly", pd.Timedelta(weeks=1)),
+]
+
+
+def choose_resolution(start, end, max_points=MAX_POINTS):
+    span = pd.Timestamp(end) - pd.Timestamp(start)
+    for rule, label, step in RESOLUTIONS:
+        if span / step <= max_points:
+            return rule, label
+    return RESOLUTIONS[-1][:2]
+
+
+def resample_counts(series, rule, time_column='TimeInterval', value_column='Count'):
+    times = series[time_column]
+    if rule == "W":
+        buckets = times.dt.to_period("W").dt.start_time
+    else:
+        buckets = times.dt.floor(rule)
+    return series.groupby(buckets.rename(time_column))[value_column].sum().reset_index()
+
+
+def lttb(x, y, threshold):
+    # Indices of the points to keep; x must be increasing
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    keep = np.empty(threshold, dtype=int)
+    keep[0] = 0
+    keep[-1] = n - 1
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_start, next_end = edges[i + 1], edges[i + 2] if i + 2 < len(edges) else n
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        area = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        keep[i + 1] = previous
+    return keep
+
+
+def downsample_timeline(timeline, max_points=MAX_POINTS, time_column='TimeInterval', value_column='Count'):
+    # Returns (points, resolution label) ready for a line chart
+    if timeline.empty:
+        return timeline, RESOLUTIONS[0][1]
+    rule, label = choose_resolution(timeline[time_column].min(), timeline[time_column].max(), max_points)
+    points = timeline if rule == "15min" else resample_counts(timeline, rule, time_column, value_column)
+    if len(points) > max_points:
+        x = points[time_column].to_numpy().astype('datetime64[s]').astype(np.int64)
+        points = points.iloc[lttb(x, points[value_column].to_numpy(), max_points)]
+    return points.reset_index(drop=True), label
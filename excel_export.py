@@ -0,0 +1,154 @@
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+from aggregates import SLOT_LABELS
+from metrics import metrics
+
+# Excel report: a "Summary" sheet with one row per day, then one sheet per day
+# with its 15-minute intervals. Every sheet ends with a "Total" row.
+# Rows are written whole with write_row in constant_memory mode, so a long
+# date range streams to the file instead of building every cell in memory.
+
+DATE_LABEL = '%d-%b-%y'
+SUMMARY_COLUMNS = {
+    'Total_Case': 'Total Case',
+    'Bot_Working_Case': 'Bot Working Case',
+    'Supervisor_Working_Case': 'Supervisor Working Case',
+}
+HEADER_FORMAT = {
+    'bold': True, 'align': 'center', 'valign': 'vcenter',
+    'bg_color': '#8064A1', 'font_color': 'white', 'border': 1
+}
+CELL_FORMAT = {
+    'align': 'center', 'valign': 'vcenter', 'bg_color': '#E3DFED', 'border': 1
+}
+TOTAL_ROW_FORMAT = {
+    'bold': True, 'align': 'center', 'valign': 'vcenter',
+    'bg_color': '#3B3838', 'font_color': 'white', 'border': 1
+}
+
+
+def percent_labels(part, total):
+    part = np.asarray(part, dtype=float)
+    total = np.asarray(total, dtype=float)
+    percent = np.divide(part * 100, total, out=np.zeros_like(part), where=total > 0)
+    return np.char.mod('%.2f', percent)
+
+
+def _with_total(table, labels):
+    # Append the "Total" row: sums of the count columns, % recomputed from them
+    counts = table.drop(columns=list(labels) + ['% Bot Working'])
+    total = counts.sum().to_dict()
+    total.update(labels)
+    total['% Bot Working'] = percent_labels(total['Bot Working Case'], total['Total Case']).item()
+    return pd.concat([table, pd.DataFrame([total], columns=table.columns)], ignore_index=True)
+
+
+def summary_table(summary_report):
+    summary = summary_report.groupby('Date', sort=True)[list(SUMMARY_COLUMNS.values())].sum()
+    summary = summary.astype(np.int64).reset_index()
+    summary['Date'] = pd.to_datetime(summary['Date']).dt.strftime(DATE_LABEL)
+    summary['% Bot Working'] = percent_labels(summary['Bot Working Case'], summary['Total Case'])
+    summary = _with_total(summary, {'Date': 'Total'})
+    return summary.rename(columns={name: label for label, name in SUMMARY_COLUMNS.items()})
+
+
+def day_tables(summary_report):
+    # Format and compute once for the whole range, then cut it per day
+    report = summary_report.sort_values('Date', kind='stable').reset_index(drop=True)
+    dates = report['Date'].to_numpy()
+    report.insert(1, '15 Minute Interval', SLOT_LABELS[report.pop('Slot').to_numpy()])
+    count_columns = [column for column in report.columns if column not in ('Date', '15 Minute Interval')]
+    report[count_columns] = report[count_columns].astype(np.int64)
+    report['Date'] = pd.to_datetime(report['Date']).dt.strftime(DATE_LABEL)
+    report['% Bot Working'] = percent_labels(report['Bot Working Case'], report['Total Case'])
+
+    starts = np.flatnonzero(np.r_[True, dates[1:] != dates[:-1]]) if len(dates) else []
+    bounds = list(starts) + [len(report)]
+    for start, end in zip(bounds[:-1], bounds[1:]):
+        day = report.iloc[start:end]
+        yield day['Date'].iat[0], _with_total(day, {'Date': 'Total', '15 Minute Interval': ''})
+
+
+def report_sheets(summary_report):
+    # Same sheets as the workbook, as DataFrames (used for the on-page preview)
+    yield "Summary", summary_table(summary_report)
+    yield from day_tables(summary_report)
+
+
+def sheet_rows(sheet_name, table):
+    # Plain Python values, ready for write_row (and cheap to pickle)
+    return sheet_name, list(table.columns), table.to_numpy(dtype=object).tolist()
+
+
+def _write_sheet(workbook, sheet_name, columns, rows, formats):
+    header_format, cell_format, total_row_format = formats
+    worksheet = workbook.add_worksheet(sheet_name)
+    for col_num, column_name in enumerate(columns):
+        worksheet.set_column(col_num, col_num, max(len(column_name), 15))
+    worksheet.write_row(0, 0, columns, header_format)
+
+    last = len(rows)
+    for row_num, row_data in enumerate(rows, start=1):
+        worksheet.write_row(row_num, 0, row_data, total_row_format if row_num == last else cell_format)
+
+
+def write_workbook(sheets):
+    # sheets: iterable of (sheet_name, columns, rows) in workbook order
+    output = BytesIO()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+    formats = (
+        workbook.add_format(HEADER_FORMAT),
+        workbook.add_format(CELL_FORMAT),
+        workbook.add_format(TOTAL_ROW_FORMAT),
+    )
+    for sheet_name, columns, rows in sheets:
+        _write_sheet(workbook, sheet_name, columns, rows, formats)
+    workbook.close()
+    output.seek(0)
+    return output
+
+
+def create_excel_download(summary_report):
+    with metrics.span("report.excel_export"):
+        return write_workbook(
+            sheet_rows(sheet_name, table) for sheet_name, table in report_sheets(summary_report)
+        )
+
+
+class ExportCache:
+    """Finished workbooks kept as bytes, least recently used dropped first."""
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def peek(self, key):
+        with self._lock:
+            if key in self._items:
+                self._items.move_to_end(key)
+            return self._items.get(key)
+
+    def put(self, key, data):
+        with self._lock:
+            self._items[key] = data
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def get(self, key, build):
+        data = self.peek(key)
+        if data is None:
+            data = build()
+            self.put(key, data)
+        return data
+
+
+# Shared by every session of the server process
+export_cache = ExportCache()
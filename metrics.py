@@ -0,0 +1,148 @@
+import json
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+# Lightweight timing for the hot paths: Google auth, sheet fetches, parsing,
+# aggregation, chart building and the Excel export. Spans and counters are
+# kept per process (exported as Prometheus text or JSON lines) and per page
+# rerun, which the optional admin panel shows in the sidebar.
+
+PREFIX = "rpa"
+RECENT_RUNS = 500
+
+
+def _metric_name(name):
+    return re.sub(r"\W", "_", f"{PREFIX}_{name}")
+
+
+class Metrics:
+    def __init__(self, recent_runs=RECENT_RUNS):
+        self.timings = {}  # span -> [count, total seconds, max seconds]
+        self.counters = Counter()
+        self.runs = deque(maxlen=recent_runs)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def run(self):
+        # The rerun being recorded on this thread, if any
+        return getattr(self._local, "run", None)
+
+    def bind(self, call):
+        # call, recording into this thread's rerun when run on a worker thread
+        run = self.run
+
+        def bound(*args, **kwargs):
+            previous = self.run
+            self._local.run = run
+            try:
+                return call(*args, **kwargs)
+            finally:
+                self._local.run = previous
+
+        return bound
+
+    @contextmanager
+    def span(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name, seconds):
+        with self._lock:
+            stat = self.timings.setdefault(name, [0, 0.0, 0.0])
+            stat[0] += 1
+            stat[1] += seconds
+            stat[2] = max(stat[2], seconds)
+            if self.run is not None:
+                self.run["spans"].append((name, seconds))
+
+    def increment(self, name, value=1):
+        with self._lock:
+            self.counters[name] += value
+            if self.run is not None:
+                self.run["counters"][name] += value
+
+    def start_run(self, page):
+        self._local.run = {"page": page, "time": time.time(), "started": time.perf_counter(),
+                           "spans": [], "counters": Counter()}
+
+    def finish_run(self, log_file=None):
+        run = self.run
+        if run is None:
+            return None
+        self._local.run = None
+        record = {
+            "time": run["time"],
+            "page": run["page"],
+            "seconds": time.perf_counter() - run["started"],
+            "spans": run["spans"],
+            "counters": dict(run["counters"]),
+        }
+        self.runs.append(record)
+        if log_file:
+            with open(log_file, "a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record) + "\n")
+        return record
+
+    def prometheus(self):
+        with self._lock:
+            timings = {name: list(stat) for name, stat in sorted(self.timings.items())}
+            counters = dict(sorted(self.counters.items()))
+        seconds = _metric_name("span_seconds")
+        lines = [f"# TYPE {seconds} summary"]
+        for name, (count, total, _) in timings.items():
+            lines.append(f'{seconds}_count{{span="{name}"}} {count}')
+            lines.append(f'{seconds}_sum{{span="{name}"}} {total:.6f}')
+        lines.append(f"# TYPE {seconds}_max gauge")
+        for name, (_, _, longest) in timings.items():
+            lines.append(f'{seconds}_max{{span="{name}"}} {longest:.6f}')
+        for name, value in counters.items():
+            metric = _metric_name(name) + "_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        return "\n".join(lines) + "\n"
+
+    def json_lines(self):
+        return "".join(json.dumps(record) + "\n" for record in list(self.runs))
+
+
+metrics = Metrics()
+
+
+def span(name):
+    return metrics.span(name)
+
+
+def start_run(page):
+    metrics.start_run(page)
+
+
+def perf_panel():
+    # Optional [METRICS] section in secrets.toml:
+    #   panel = true                       # sidebar panel with per-rerun timings
+    #   log_file = ".cache/metrics.jsonl"  # one JSON line per rerun
+    settings = st.secrets.get("METRICS", {})
+    record = metrics.finish_run(settings.get("log_file"))
+    if record is None or not settings.get("panel", False):
+        return
+    with st.sidebar.expander("⏱ Performance"):
+        st.caption(f"{record['page']}: {record['seconds'] * 1000:.0f} ms this rerun")
+        if record["spans"]:
+            st.dataframe(
+                pd.DataFrame(record["spans"], columns=["Stage", "Seconds"])
+                .assign(ms=lambda frame: (frame["Seconds"] * 1000).round(1))[["Stage", "ms"]],
+                hide_index=True,
+            )
+        for name, value in record["counters"].items():
+            st.caption(f"{name}: {value:,}")
+        st.download_button("Prometheus", metrics.prometheus(), "metrics.prom", "text/plain")
+        st.download_button("JSON lines", metrics.json_lines(), "metrics.jsonl", "application/json")
@@ -0,0 +1,124 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from datetime import timedelta
+
+import metrics
+import sheets
+from aggregates import SLOT_LABELS, WEEKDAYS, IntervalCube
+
+st.set_page_config(
+    page_title="Capacity Planning",
+    page_icon="🗓️",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+metrics.start_run("Capacity")
+
+st.markdown("### Capacity Planning")
+
+# Sync "Daily" (new rows only) of the selected bots and get their summed
+# date x 15-minute x responder counts
+sheets.refresh_button()
+bots = sheets.select_bots()
+with metrics.span("capacity.load"):
+    cube = sheets.load_fleet_view("Daily", IntervalCube, bots)
+sheets.data_status("Daily", bots=bots)
+available_dates = cube.dates()
+
+if not available_dates:
+    st.warning("No data available in the Daily sheet.")
+    st.stop()
+
+# Sidebar input for the dates to average over, the last 8 weeks by default
+start_date, end_date = st.sidebar.date_input(
+    "Select Date Range",
+    value=(max(available_dates[0], available_dates[-1] - timedelta(weeks=8) + timedelta(days=1)), available_dates[-1]),
+    min_value=available_dates[0],
+    max_value=available_dates[-1]
+)
+exclude_dates = st.sidebar.multiselect(
+    "Exclude Specific Dates",
+    options=pd.date_range(start=start_date, end=end_date).date,
+    format_func=lambda x: x.strftime("%A %d-%b-%Y"),
+    default=[]
+)
+exclude_days = st.sidebar.multiselect(
+    "Exclude Weekdays",
+    options=list(range(7)),
+    format_func=lambda x: WEEKDAYS[x],
+    default=[]
+)
+measure = st.sidebar.radio("Show", ["Supervisor", "Bot", "All", "Supervisor Share (%)"])
+
+# Every view below is a sum over the pre-aggregated cells, not over raw rows
+filters = dict(start=start_date, end=end_date, exclude_dates=exclude_dates, exclude_weekdays=exclude_days)
+with metrics.span("capacity.rollups"):
+    responders, means, days = cube.weekday_slots(**filters)
+    _, _, hourly = cube.hourly(**filters)
+
+
+def responder_cells(values, name):
+    return values[..., responders.index(name)] if name in responders else np.zeros(values.shape[:-1])
+
+
+if not days.sum():
+    st.warning("No data available for the selected date range.")
+    st.stop()
+
+if measure == "All":
+    cells = means.sum(axis=2)
+elif measure == "Supervisor Share (%)":
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cells = responder_cells(means, "Supervisor") / means.sum(axis=2) * 100
+else:
+    cells = responder_cells(means, measure)
+
+heatmap = px.imshow(
+    np.round(cells, 2),
+    x=list(SLOT_LABELS),
+    y=WEEKDAYS,
+    aspect="auto",
+    color_continuous_scale=["#ffffff", "#eed3ff", "#a933dc", "#5b0a80"],
+    labels={'x': '15 Minute Interval', 'y': 'Weekday', 'color': 'Cases' if '%' not in measure else '%'},
+    title=f"{measure}: average cases per weekday and 15-minute interval"
+)
+st.plotly_chart(heatmap, use_container_width=True)
+st.caption("Averaged over the dates with cases: " + ", ".join(
+    f"{WEEKDAYS[day][:3]} {count}" for day, count in enumerate(days) if count
+))
+
+col1, col2 = st.columns(2)
+
+with col1:
+    # Average day profile by hour
+    profile = pd.DataFrame(hourly.mean(axis=0), columns=responders)
+    profile.insert(0, 'Hour', [f"{hour:02d}:00" for hour in range(len(profile))])
+    hour_fig = px.bar(
+        profile.melt(id_vars='Hour', var_name='Response', value_name='Cases'),
+        x='Hour',
+        y='Cases',
+        color='Response',
+        barmode='stack',
+        title="Average Cases per Hour of Day",
+        color_discrete_map={"Bot": "#a933dc", "Supervisor": "#eed3ff"}
+    )
+    st.plotly_chart(hour_fig, use_container_width=True)
+
+with col2:
+    # Average day total by weekday
+    daily = cube.daily(**filters).groupby('Weekday')[responders].mean().reindex(range(7)).dropna()
+    daily.index = [WEEKDAYS[day] for day in daily.index]
+    weekday_fig = px.bar(
+        daily.reset_index(names='Weekday').melt(id_vars='Weekday', var_name='Response', value_name='Cases'),
+        x='Weekday',
+        y='Cases',
+        color='Response',
+        barmode='stack',
+        title="Average Cases per Weekday",
+        color_discrete_map={"Bot": "#a933dc", "Supervisor": "#eed3ff"}
+    )
+    st.plotly_chart(weekday_fig, use_container_width=True)
+
+metrics.perf_panel()
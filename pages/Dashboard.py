@@ -1,10 +1,13 @@
 import streamlit as st
-import gspread
 import pandas as pd
 import plotly.express as px
-from oauth2client.service_account import ServiceAccountCredentials
 from datetime import datetime, timedelta
 
+import charts
+import metrics
+import sheets
+from aggregates import IntervalCube
+
 # Set Streamlit page configuration
 st.set_page_config(
     page_title="Dashboard",
@@ -12,45 +15,20 @@ st.set_page_config(
     layout="wide",
     initial_sidebar_state="expanded",
 )
+metrics.start_run("Dashboard")
 
 st.markdown("### Bot Performance Dashboard")
 
-# Authenticate and connect to Google Sheets
-scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-credentials_dict = {
-    "type": st.secrets["GOOGLE_SHEETS"]["type"],
-    "project_id": st.secrets["GOOGLE_SHEETS"]["project_id"],
-    "private_key_id": st.secrets["GOOGLE_SHEETS"]["private_key_id"],
-    "private_key": st.secrets["GOOGLE_SHEETS"]["private_key"],
-    "client_email": st.secrets["GOOGLE_SHEETS"]["client_email"],
-    "client_id": st.secrets["GOOGLE_SHEETS"]["client_id"],
-    "auth_uri": st.secrets["GOOGLE_SHEETS"]["auth_uri"],
-    "token_uri": st.secrets["GOOGLE_SHEETS"]["token_uri"],
-    "auth_provider_x509_cert_url": st.secrets["GOOGLE_SHEETS"]["auth_provider_x509_cert_url"],
-    "client_x509_cert_url": st.secrets["GOOGLE_SHEETS"]["client_x509_cert_url"]
-}
-credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict, scope)
-gc = gspread.authorize(credentials)
-sh = gc.open_by_key(st.secrets["GOOGLE_SHEETS"]["google_sheet_key"])
-
-# Fetch data from "Logdata" sheet
-logdata_sheet = sh.worksheet("Daily")
-logdata_data = logdata_sheet.get_all_records()
-df_logdata = pd.DataFrame(logdata_data)
-
-# Ensure 'Created' is a valid datetime column
-df_logdata['Created'] = pd.to_datetime(df_logdata['Created'], errors='coerce')
-if df_logdata['Created'].isna().any():
-    st.error("Some 'Created' column values could not be parsed as datetime.")
-else:
-    df_logdata['Date'] = df_logdata['Created'].dt.date
-    df_logdata['TimeInterval'] = df_logdata['Created'].dt.floor('15T')
-
-# Debugging: Check the DataFrame
-# st.write("Debug: Data after processing", df_logdata.head())
+# Sync "Daily" (new rows only) of the selected bots and get their summed
+# date x 15-minute x responder counts
+sheets.refresh_button()
+bots = sheets.select_bots()
+with metrics.span("dashboard.load"):
+    cube = sheets.load_fleet_view("Daily", IntervalCube, bots)
+sheets.data_status("Daily", bots=bots)
 
 # Get all unique dates in the dataset
-available_dates = df_logdata['Date'].sort_values().unique()
+available_dates = cube.dates()
 
 # Default to the latest day in the dataset
 default_date = max(available_dates)
@@ -73,20 +51,17 @@ exclude_dates = st.sidebar.multiselect(
     default=[]  # No default exclusion
 )
 
-# Filter data based on the selected date range and excluded dates
-filtered_data = df_logdata[
-    (df_logdata['Date'] >= start_date) & 
-    (df_logdata['Date'] <= end_date) & 
-    (~df_logdata['Date'].isin(exclude_dates))
-]
+# Slice the counts for the selected date range and excluded dates
+filters = dict(start=start_date, end=end_date, exclude_dates=exclude_dates)
+totals = cube.totals(**filters)
 
-# Handle empty DataFrame
-if filtered_data.empty:
+# Handle empty selection
+if not sum(totals.values()):
     st.warning("No data available for the selected date range.")
 else:
     # Calculate totals
-    total_all_cases = len(filtered_data)
-    total_success_cases = len(filtered_data[filtered_data['Response'] == 'Bot'])
+    total_all_cases = sum(totals.values())
+    total_success_cases = totals.get('Bot', 0)
     total_not_success_cases = total_all_cases - total_success_cases
 
     # Function to display a card
@@ -119,7 +94,8 @@ else:
         display_card("Supervisor Working Cases", total_not_success_cases)
 
     # Group by 'TimeInterval' and 'Response' to count cases for stacked bar chart
-    interval_data = filtered_data.groupby(['TimeInterval', 'Response']).size().reset_index(name='Count')
+    with metrics.span("dashboard.interval_counts"):
+        interval_data = cube.interval_counts(**filters)
 
     # Stacked Bar Chart
     bar_fig = px.bar(
@@ -144,7 +120,9 @@ else:
     st.plotly_chart(bar_fig, use_container_width=True)
 
     # Time Series Line Chart: Count of Cases Over Time (all day data)
-    time_series_data = df_logdata.groupby('TimeInterval').size().reset_index(name='Count')
+    # Rolled up to a coarser resolution as history grows, then LTTB-thinned to a bounded point count
+    with metrics.span("dashboard.timeline"):
+        time_series_data, resolution = charts.downsample_timeline(cube.timeline())
     # st.write("Debug: Time Series Data", time_series_data.head())
 
     line_fig = px.line(
@@ -152,7 +130,8 @@ else:
         x='TimeInterval',
         y='Count',
         labels={'TimeInterval': 'Time Interval', 'Count': 'Number of Cases'},
-        title="Time Series: Number of Cases Over Time (All Day)"
+        title=f"Time Series: Number of Cases Over Time (All Day, {resolution})",
+        render_mode="webgl"
     )
 
     # Update line color to golden yellow
@@ -166,3 +145,5 @@ else:
 
     # Display the line chart
     st.plotly_chart(line_fig, use_container_width=True)
+
+metrics.perf_panel()
@@ -0,0 +1,89 @@
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+from datetime import timedelta
+
+import metrics
+import sheets
+from aggregates import RunSummary
+
+st.set_page_config(
+    page_title="Run History",
+    page_icon="📈",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+metrics.start_run("Run History")
+
+st.markdown("### Bot Run History")
+
+# Sync "Logdata" (new rows only) of the selected bots and get their per-run counts
+sheets.refresh_button()
+bots = sheets.select_bots()
+with metrics.span("runs.load"):
+    runs = sheets.load_fleet_view("Logdata", RunSummary, bots).runs()
+sheets.data_status("Logdata", bots=bots)
+runs = runs[runs['Run Start'].notna()]
+
+if runs.empty:
+    st.warning("No data available in the Logdata sheet.")
+    st.stop()
+
+first_day, last_day = runs['Run Start'].iloc[0].date(), runs['Run Start'].iloc[-1].date()
+
+# Sidebar input for the runs to show, the last 30 days by default
+start_date, end_date = st.sidebar.date_input(
+    "Select Date Range",
+    value=(max(first_day, last_day - timedelta(days=29)), last_day),
+    min_value=first_day,
+    max_value=last_day
+)
+selected = runs[(runs['Run Start'] >= pd.Timestamp(start_date))
+                & (runs['Run Start'] < pd.Timestamp(end_date + timedelta(days=1)))].copy()
+selected['Success Rate (%)'] = (selected['Success'] / selected['Cases'].where(selected['Cases'] > 0) * 100).round(2)
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Bot Runs", f"{len(selected):,}")
+col2.metric("Cases", f"{selected['Cases'].sum():,}")
+col3.metric(
+    "Success Rate",
+    f"{selected['Success'].sum() / selected['Cases'].sum() * 100:.2f}%" if selected['Cases'].sum() else "-"
+)
+
+with metrics.span("runs.charts"):
+    # Success and failure per run
+    result_fig = px.bar(
+        selected.melt(id_vars='Run Start', value_vars=['Success', 'Failed'], var_name='Result', value_name='Count'),
+        x='Run Start',
+        y='Count',
+        color='Result',
+        barmode='stack',
+        title="Cases per Bot Run",
+        color_discrete_map={"Success": "#a933dc", "Failed": "#eed3ff"}
+    )
+    st.plotly_chart(result_fig, use_container_width=True)
+
+    # How far the bot got on each run
+    steps_fig = px.line(
+        selected.melt(id_vars='Run Start', value_vars=['Deleted', 'SMS Sent', 'VOC Sent'], var_name='Step', value_name='Count'),
+        x='Run Start',
+        y='Count',
+        color='Step',
+        markers=True,
+        title="Steps Completed per Bot Run"
+    )
+    st.plotly_chart(steps_fig, use_container_width=True)
+
+    rate_fig = px.line(
+        selected,
+        x='Run Start',
+        y='Success Rate (%)',
+        markers=True,
+        title="Success Rate per Bot Run"
+    )
+    rate_fig.update_traces(line_color="#8902a0")
+    st.plotly_chart(rate_fig, use_container_width=True)
+
+st.dataframe(selected.iloc[::-1], hide_index=True)
+
+metrics.perf_panel()
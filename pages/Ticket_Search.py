@@ -0,0 +1,78 @@
+import streamlit as st
+import numpy as np
+from datetime import timedelta
+
+import metrics
+import reasons
+import schema
+import sheets
+from ticket_index import TicketIndex
+
+st.set_page_config(
+    page_title="Ticket Search",
+    page_icon="🔎",
+    layout="wide",
+    initial_sidebar_state="expanded",
+)
+metrics.start_run("Ticket Search")
+
+st.markdown("### Ticket Search")
+
+# Sync "Logdata" (new rows only) and get its ticket / run start index, with
+# the rows it points into
+sheets.refresh_button()
+bot = sheets.select_bot()
+with metrics.span("tickets.load"):
+    index, logdata = sheets.load_view_rows("Logdata", TicketIndex, bot=bot)
+sheets.data_status("Logdata", bots=[bot])
+
+# Longer windows are cut to keep the table responsive
+MAX_ROWS = 10_000
+
+
+def with_reasons(rows):
+    # Run start first, and why the bot left the ticket for failed runs
+    rows = rows.copy()
+    rows.insert(0, 'Run Start', schema.run_start(rows))
+    failed = (rows['RPA_Result'] == 'No').to_numpy()
+    rows['Reason'] = np.where(failed, reasons.reason_messages(rows), '')
+    return rows.reset_index(drop=True)
+
+
+ticket = st.text_input("Ticket No.", placeholder="Search a ticket to see every bot run that handled it").strip()
+
+if ticket:
+    with metrics.span("tickets.lookup"):
+        history = logdata.iloc[index.positions(ticket)]
+    if history.empty:
+        st.warning(f"Ticket {ticket} was not found in Logdata.")
+    else:
+        st.markdown(f"##### 🎫 Bot history of {ticket} ({len(history)} runs)")
+        st.dataframe(with_reasons(history), hide_index=True)
+else:
+    first_day, last_day = index.date_range()
+    if first_day is None:
+        st.warning("No data available in the Logdata sheet.")
+        st.stop()
+
+    # Sidebar input for the bot runs to browse
+    start_date, end_date = st.sidebar.date_input(
+        "Run Date Range",
+        value=(last_day, last_day),
+        min_value=first_day,
+        max_value=last_day
+    )
+    failed_only = st.sidebar.checkbox("Failed cases only", value=True)
+
+    with metrics.span("tickets.window"):
+        window = logdata.iloc[index.between(start_date, end_date + timedelta(days=1))]
+        if failed_only:
+            window = window[window['RPA_Result'] == 'No']
+
+    st.markdown(f"##### Tickets of the runs from {start_date} to {end_date} ({len(window):,} rows)")
+    if len(window) > MAX_ROWS:
+        st.caption(f"Showing the latest {MAX_ROWS:,} rows")
+        window = window.iloc[-MAX_ROWS:]
+    st.dataframe(with_reasons(window), hide_index=True)
+
+metrics.perf_panel()
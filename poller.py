@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+
+import streamlit as st
+
+import sheets
+
+# One background thread per server process keeps the Bot Monitor data fresh.
+# It reads only the tail of "Notification" (incremental sync) and, when a new
+# notification arrived, syncs "Logdata" too. Sessions read the shared cache
+# from a `st.fragment(run_every=...)`, so the number of Sheets API calls does
+# not depend on how many people have the page open.
+
+DEFAULT_POLL_SECONDS = 15
+
+logger = logging.getLogger(__name__)
+
+
+class Poller(threading.Thread):
+    def __init__(self, cache, interval=DEFAULT_POLL_SECONDS, watch="Notification", follow=("Logdata",)):
+        super().__init__(name="sheets-poller", daemon=True)
+        self.cache = cache
+        self.interval = interval
+        self.watch = watch
+        self.follow = tuple(follow)
+        self.rows = None
+        self.updated_at = None
+        self.error = None
+        self._stop_event = threading.Event()
+
+    @property
+    def stale_after(self):
+        # Pages fall back to fetching themselves if the poller stopped
+        return self.interval * 4
+
+    def poll(self):
+        if self.rows is None:
+            # First poll: every sheet in one request
+            frames = self.cache.refresh_many([self.watch, *self.follow], ttl=0, block=True)
+            rows = len(frames[self.watch])
+        else:
+            # Later polls: only the tail of the watched sheet, the others
+            # when it changed
+            rows = len(self.cache.refresh(self.watch, ttl=0, block=True))
+            if rows != self.rows:
+                self.cache.refresh_many(self.follow, ttl=0, block=True)
+        self.rows = rows
+        self.updated_at = time.time()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+                self.error = None
+            except Exception as error:  # keep polling through API hiccups
+                logger.warning("Sheets poll failed: %s", error)
+                self.error = error
+            self._stop_event.wait(self.interval)
+
+    def stop(self):
+        self._stop_event.set()
+
+
+@st.cache_resource(show_spinner=False)
+def _poller_for(bot):
+    settings = st.secrets.get("CACHE", {})
+    poller = Poller(sheets.get_cache(bot), interval=settings.get("poll_seconds", DEFAULT_POLL_SECONDS))
+    poller.name = f"sheets-poller-{bot}"
+    poller.start()
+    return poller
+
+
+def get_poller(bot=None):
+    # One polling thread per bot spreadsheet
+    return _poller_for(sheets._resolve(bot))
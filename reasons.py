@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+# Why a ticket was left for the supervisor, from the bot step flags.
+# Each rule is (code, RPA_Delete, RPA_SendSMS, RPA_SendVOC); None matches any
+# value. Rules are checked in order, the first match wins and rows matching
+# nothing get UNKNOWN.
+RULES = [
+    ("NOT_ELIGIBLE", "No", None, None),
+    ("DELETED_ONLY", "Yes", "No", None),
+    ("ALL_STEPS_DONE", "Yes", "Yes", "Yes"),
+    ("SMS_SENT", "Yes", "Yes", None),
+]
+UNKNOWN = "UNKNOWN"
+
+MESSAGES = {
+    "th": {
+        "NOT_ELIGIBLE": "ไม่เข้าเงื่อนไขที่ Bot ทำงาน ให้ Supervisor ตรวจสอบ",
+        "DELETED_ONLY": "Bot ทำการลบรายการใน e-service แล้ว แต่ยังไม่ได้ดำเนินการในขั้นตอนส่ง SMS และ VOC",
+        "SMS_SENT": "Bot ทำการลบรายการและส่ง sms เรียบร้อย เหลือขั้นตอน SendVOC ที่ยังไม่ได้ดำเนินการ",
+        "ALL_STEPS_DONE": "Bot ดำเนินการครบทุกขั้นตอนแล้ว แต่ผลลัพธ์ไม่สำเร็จ ให้ Supervisor ตรวจสอบ",
+        UNKNOWN: "",
+    },
+    "en": {
+        "NOT_ELIGIBLE": "Not eligible for the bot, supervisor to check",
+        "DELETED_ONLY": "Deleted in e-service, SMS and VOC not done yet",
+        "SMS_SENT": "Deleted and SMS sent, SendVOC not done yet",
+        "ALL_STEPS_DONE": "All steps done but the result failed, supervisor to check",
+        UNKNOWN: "",
+    },
+}
+
+CODES = [code for code, *_ in RULES] + [UNKNOWN]
+STEP_COLUMNS = ['RPA_Delete', 'RPA_SendSMS', 'RPA_SendVOC']
+
+
+def classify(frame):
+    steps = [frame[column].to_numpy() for column in STEP_COLUMNS]
+    conditions = []
+    for _, *expected in RULES:
+        condition = np.ones(len(frame), dtype=bool)
+        for values, value in zip(steps, expected):
+            if value is not None:
+                condition &= values == value
+        conditions.append(condition)
+    codes = np.select(conditions, np.arange(len(RULES)), default=len(RULES))
+    return pd.Series(
+        pd.Categorical.from_codes(codes, categories=CODES), index=frame.index, name='Reason Code'
+    )
+
+
+def reason_messages(frame, lang="th"):
+    codes = classify(frame)
+    messages = [MESSAGES[lang][code] for code in codes.cat.categories]
+    # Map the handful of categories, not every row
+    return pd.Series(
+        np.asarray(messages, dtype=object)[codes.cat.codes.to_numpy()], index=frame.index, name='Reason'
+    )
+
+
+def failed_cases(logdata, startdate, lang="th"):
+    # Tickets of one bot run left for the supervisor, with the reason why
+    relevant_logs = logdata[['Ticket No.', 'RPA_Delete', 'RPA_SendSMS', 'RPA_SendVOC',
+                             'RPA_Result', 'RPA_Startdate', 'RPA_Starttime']]
+    relevant_logs = relevant_logs[(relevant_logs['RPA_Result'] == 'No') &
+                                  (relevant_logs['RPA_Startdate'] == startdate)].copy()
+    relevant_logs['Reason'] = reason_messages(relevant_logs, lang)
+    return relevant_logs[['Ticket No.', 'RPA_Startdate', 'RPA_Starttime', 'Reason', 'RPA_Delete',
+                          'RPA_SendSMS', 'RPA_SendVOC', 'RPA_Result']]
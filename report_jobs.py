@@ -0,0 +1,156 @@
+import os
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.context import SpawnContext, SpawnProcess
+
+from excel_export import day_tables, export_cache, sheet_rows, summary_table, write_workbook
+
+# Background Excel jobs for long date ranges. Per-day sheets are prepared in a
+# process pool and the workbook is written by one more task in the same pool;
+# a thread of this process only waits for them and puts the finished bytes in
+# the shared export cache. Neither the Streamlit script nor the other users'
+# sessions wait on the GIL for the export.
+
+LONG_RANGE_DAYS = 31
+
+_main_lock = threading.Lock()
+
+
+class _WorkerProcess(SpawnProcess):
+    # Streamlit installs the running page as __main__, and spawn re-imports
+    # __main__ in the child: the worker would run the page (login, Sheets
+    # loads) before its first task. Start it with a __main__ that has no file.
+    def start(self):
+        with _main_lock:
+            page, stub = sys.modules["__main__"], types.ModuleType("__main__")
+            sys.modules["__main__"] = stub
+            try:
+                super().start()
+            finally:
+                # Unless a new page run installed its own meanwhile
+                if sys.modules["__main__"] is stub:
+                    sys.modules["__main__"] = page
+
+
+class _WorkerContext(SpawnContext):
+    # spawn: forking a threaded server process is not safe
+    Process = _WorkerProcess
+
+
+def _day_sheet(day_report):
+    # Runs in a worker process: one day of summary_report -> rows of its sheet
+    (sheet_name, table), = day_tables(day_report)
+    return sheet_rows(sheet_name, table)
+
+
+def _workbook(summary_report, day_sheets):
+    # Runs in a worker process: the Summary sheet plus the day sheets -> bytes
+    summary = sheet_rows("Summary", summary_table(summary_report))
+    return write_workbook([summary] + day_sheets).getvalue()
+
+
+class ReportJob:
+    def __init__(self, key, total):
+        self.key = key
+        self.total = total
+        self.done = 0
+        self.data = None
+        self.error = None
+        self.started_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    @property
+    def progress(self):
+        # The last step is writing the workbook itself, in a worker too
+        return 1.0 if self.finished else self.done / (self.total + 1)
+
+
+class ReportJobRunner:
+    def __init__(self, max_workers=None, cache=export_cache):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.cache = cache
+        self._jobs = {}
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_WorkerContext())
+        return self._pool
+
+    def _replace_executor(self, broken):
+        # A worker died (e.g. killed for memory) and the pool accepts no more
+        # work: start a new one unless another job already did
+        with self._lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            return self._executor()
+
+    def job(self, key):
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is None:
+            data = self.cache.peek(key)
+            if data is not None:
+                job = ReportJob(key, 0)
+                job.data = data
+                job.finished_at = job.started_at
+        return job
+
+    def submit(self, key, summary_report):
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and job.error is None:
+                return job
+            days = [part for _, part in summary_report.groupby('Date', sort=True)]
+            job = ReportJob(key, len(days))
+            self._jobs[key] = job
+            executor = self._executor()
+        threading.Thread(
+            target=self._run, args=(job, executor, summary_report, days), name="report-job", daemon=True
+        ).start()
+        return job
+
+    def _build(self, job, executor, summary_report, days):
+        job.done = 0
+        futures = {executor.submit(_day_sheet, day): index for index, day in enumerate(days)}
+        day_sheets = [None] * len(days)
+        for future in as_completed(futures):
+            day_sheets[futures[future]] = future.result()
+            job.done += 1
+        return executor.submit(_workbook, summary_report, day_sheets).result()
+
+    def _run(self, job, executor, summary_report, days):
+        try:
+            for attempt in range(2):
+                try:
+                    data = self._build(job, executor, summary_report, days)
+                    break
+                except BrokenProcessPool:
+                    # Try once more on a new pool; later jobs use it either way
+                    executor = self._replace_executor(executor)
+                    if attempt:
+                        raise
+            self.cache.put(job.key, data)
+            job.data = data
+        except Exception as error:
+            job.error = error
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                # Finished workbooks live in the export cache from here on
+                if self._jobs.get(job.key) is job and job.error is None:
+                    del self._jobs[job.key]
+
+
+# Shared by every session of the server process
+report_jobs = ReportJobRunner()
@@ -0,0 +1,97 @@
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+# Typed columns for the worksheets, applied once when rows are ingested.
+# Sheet cells arrive as strings; here they become datetimes, small integers
+# and categoricals so pages never re-parse them on a rerun.
+
+# Bump when parsed dtypes change so stored snapshots are rebuilt
+VERSION = 1
+CREATED_FORMAT = "%d/%m/%Y %H:%M:%S"
+FLAG_CATEGORIES = ["No", "Yes"]
+RESPONDERS = ["Bot", "Supervisor"]
+FLAG_COLUMNS = ["RPA_Delete", "RPA_SendSMS", "RPA_SendVOC", "RPA_Result"]
+DAILY_COLUMNS = ["Ticket No.", "Created", "Response"]
+LOGDATA_COLUMNS = ["Ticket No.", *FLAG_COLUMNS, "RPA_Startdate", "RPA_Starttime"]
+
+
+def _categorical(values, categories=()):
+    # Known categories first so codes are stable; anything unexpected is kept
+    values = values.fillna("").astype(str)
+    extra = sorted(set(values.unique()) - set(categories))
+    return pd.Categorical(values, categories=list(categories) + extra)
+
+
+def _with_columns(frame, columns):
+    # An empty worksheet has no header at all; missing columns parse as blank
+    for column in columns:
+        if column not in frame:
+            frame[column] = pd.Series("", index=frame.index, dtype=object)
+    return frame
+
+
+def parse_daily(frame):
+    frame = _with_columns(frame, DAILY_COLUMNS)
+    created = pd.to_datetime(frame['Created'], format=CREATED_FORMAT, errors='coerce')
+    frame['Created'] = created
+    frame['Date'] = created.dt.normalize()
+    frame['TimeInterval'] = created.dt.floor('15min')
+    frame['Slot'] = (created.dt.hour * 4 + created.dt.minute // 15).astype('Int8')
+    frame['Weekday'] = created.dt.weekday.astype('Int8')
+    frame['Response'] = _categorical(frame['Response'], RESPONDERS)
+    frame['Ticket No.'] = frame['Ticket No.'].astype('string')
+    return frame
+
+
+def parse_logdata(frame):
+    frame = _with_columns(frame, LOGDATA_COLUMNS)
+    for column in FLAG_COLUMNS:
+        frame[column] = _categorical(frame[column], FLAG_CATEGORIES)
+    for column in ('RPA_Startdate', 'RPA_Starttime'):
+        frame[column] = _categorical(frame[column])
+    frame['Ticket No.'] = frame['Ticket No.'].astype('string')
+    return frame
+
+
+def _parse_labels(values, parse):
+    # Parse each distinct label once and map the result back through the codes
+    values = values if isinstance(values.dtype, pd.CategoricalDtype) else values.astype('category')
+    parsed = parse(pd.Index(values.cat.categories.astype(str)))
+    codes = values.cat.codes.to_numpy()
+    result = pd.Series(parsed[codes], index=values.index)
+    result[codes == -1] = pd.NaT
+    return result
+
+
+def _clock(labels):
+    # "HH:MM" or "HH:MM:SS"
+    labels = labels.where(labels.str.count(':') != 1, labels + ':00')
+    return pd.to_timedelta(labels, errors='coerce')
+
+
+def run_start(frame):
+    # When the bot run that logged each row started
+    dates = _parse_labels(
+        frame['RPA_Startdate'], lambda labels: pd.to_datetime(labels, errors='coerce', format='mixed').normalize()
+    )
+    return dates + _parse_labels(frame['RPA_Starttime'], _clock)
+
+
+PARSERS = {
+    "Daily": parse_daily,
+    "Logdata": parse_logdata,
+}
+
+
+def concat(frames):
+    # pd.concat turns categoricals with different categories into object
+    # columns; union the categories first so appended rows keep the dtype.
+    frames = [frame for frame in frames if frame is not None]
+    if len(frames) < 2:
+        return frames[0] if frames else None
+    combined = pd.concat(frames, ignore_index=True)
+    for column in frames[0].columns:
+        parts = [frame[column] for frame in frames if column in frame]
+        if len(parts) == len(frames) and all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            combined[column] = union_categoricals(parts, ignore_order=True)
+    return combined
@@ -0,0 +1,685 @@
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import gspread
+import pandas as pd
+import streamlit as st
+from oauth2client.service_account import ServiceAccountCredentials
+
+from aggregates import IntervalCube, RunSummary
+from metrics import metrics
+import schema
+from snapshot_store import DEFAULT_ROOT, SnapshotStore
+from ticket_index import TicketIndex
+
+# Shared Google Sheets access for every page.
+# The client and spreadsheet handle are created once per server process and
+# each worksheet is kept as a DataFrame until its TTL expires, so Streamlit
+# reruns (sidebar clicks, date changes) do not go back over the network.
+# Once a worksheet has been loaded (or restored from its local snapshot),
+# expired data keeps being served while a background thread refreshes it, so
+# pages stay fast when the Sheets API is slow or down.
+
+SCOPE = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+DEFAULT_TTL = 300  # seconds
+DEFAULT_FULL_RESYNC = 3600  # seconds, safety net for edits the tail check cannot see
+APPEND_ONLY = ("Daily", "Logdata", "Notification")
+DEFAULT_RETRIES = 5
+DEFAULT_BACKOFF = 1.0  # seconds, doubled on every retry
+DEFAULT_TIMEOUT = 10  # seconds per Sheets API request
+RETRY_AFTER = 60  # seconds before a failed background refresh is tried again
+DEFAULT_BOT = "default"  # the single [GOOGLE_SHEETS] spreadsheet when no [BOTS] are configured
+FLEET_WORKERS = 8  # bot spreadsheets fetched at the same time
+SNAPSHOTS = {"Daily": "Date", "Logdata": None, "Notification": None}  # on disk, by partition column
+logger = logging.getLogger(__name__)
+
+VIEWS = {"Daily": (IntervalCube,), "Logdata": (TicketIndex, RunSummary)}  # worksheet -> derived views kept in step with its rows
+
+
+def credentials_dict(section="GOOGLE_SHEETS"):
+    secrets = st.secrets[section]
+    return {
+        "type": secrets["type"],
+        "project_id": secrets["project_id"],
+        "private_key_id": secrets["private_key_id"],
+        "private_key": secrets["private_key"].replace("\\n", "\n"),
+        "client_email": secrets["client_email"],
+        "client_id": secrets["client_id"],
+        "auth_uri": secrets["auth_uri"],
+        "token_uri": secrets["token_uri"],
+        "auth_provider_x509_cert_url": secrets["auth_provider_x509_cert_url"],
+        "client_x509_cert_url": secrets["client_x509_cert_url"]
+    }
+
+
+def cache_settings():
+    # Optional [CACHE] section in secrets.toml:
+    #   ttl_seconds = 300
+    #   full_resync_seconds = 3600
+    #   append_only = ["Daily", "Logdata", "Notification"]
+    #   poll_seconds = 15
+    #   snapshot_dir = ".cache/snapshots"
+    #   retries = 5
+    #   backoff_seconds = 1.0
+    #   timeout_seconds = 10
+    #   background_refresh = true
+    #   [CACHE.ttl]
+    #   Daily = 600
+    settings = st.secrets.get("CACHE", {})
+    return {
+        "ttl": settings.get("ttl_seconds", DEFAULT_TTL),
+        "ttls": dict(settings.get("ttl", {})),
+        "append_only": tuple(settings.get("append_only", APPEND_ONLY)),
+        "full_resync": settings.get("full_resync_seconds", DEFAULT_FULL_RESYNC),
+        "snapshot_dir": settings.get("snapshot_dir", DEFAULT_ROOT),
+        "retries": settings.get("retries", DEFAULT_RETRIES),
+        "backoff": settings.get("backoff_seconds", DEFAULT_BACKOFF),
+        "background": settings.get("background_refresh", True),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_client():
+    with metrics.span("sheets.auth"):
+        credentials = ServiceAccountCredentials.from_json_keyfile_dict(credentials_dict(), SCOPE)
+        client = gspread.authorize(credentials)
+    client.set_timeout(st.secrets.get("CACHE", {}).get("timeout_seconds", DEFAULT_TIMEOUT))
+    client.http_client.session.hooks["response"].append(_count_response)
+    return client
+
+
+def _count_response(response, *args, **kwargs):
+    metrics.increment("sheets.http_requests")
+    metrics.increment("sheets.bytes", len(response.content))
+
+
+class SpreadsheetValues:
+    # The part of gspread.Spreadsheet the cache uses. Unlike open_by_key it
+    # makes no metadata request, so opening never touches the network.
+    def __init__(self, client, key):
+        self.client = client
+        self.id = key
+
+    def values_batch_get(self, ranges, params=None):
+        return self.client.http_client.values_batch_get(self.id, ranges, params=params)
+
+
+@st.cache_resource(show_spinner=False)
+def get_spreadsheet(key):
+    return SpreadsheetValues(get_client(), key)
+
+
+def column_letter(index):
+    return re.sub(r"\d", "", gspread.utils.rowcol_to_a1(1, index))
+
+
+def _pad(row, width):
+    row = list(row[:width])
+    return row + [""] * (width - len(row))
+
+
+def _to_frame(header, rows):
+    width = len(header)
+    rows = [_pad(row, width) for row in rows]
+    # Trailing blank rows come back from open-ended ranges, drop them
+    while rows and not any(rows[-1]):
+        rows.pop()
+    return pd.DataFrame(rows, columns=header)
+
+
+class IncrementalSheet:
+    """Append-only view of one worksheet.
+
+    Remembers how many data rows were ingested and what the last one looked
+    like. A sync reads only the header and the rows from the last ingested
+    one onwards; if the header or that last row changed, earlier rows were
+    edited or deleted and the whole sheet is read again.
+
+    With a snapshot store the parsed rows and the sync position are kept on
+    disk, so a restarted server only asks Google Sheets for the new rows.
+    Views (aggregates, indexes) are rebuilt on a full sync and receive only
+    the new rows otherwise.
+
+    `fetch` takes a list of A1 ranges (None for the whole sheet) and returns
+    their values; `plan`/`apply` let WorksheetCache batch several sheets into
+    one request.
+    """
+
+    def __init__(self, fetch, full_resync=DEFAULT_FULL_RESYNC, store=None, parse=None, views=()):
+        self.fetch = fetch
+        self.full_resync = full_resync
+        self.store = store
+        self.parse = parse
+        self.views = {type(view): view for view in views}
+        self.header = None
+        self.frame = None
+        self.row_count = 0
+        self.tail = None
+        self.synced_at = None
+        self.as_of = None  # wall-clock time the rows were last confirmed current
+        self.full_syncs = 0
+        self.incremental_syncs = 0
+        if store is not None:
+            self._restore()
+
+    def _restore(self):
+        state = self.store.load_state()
+        if not state or state.get("schema") != schema.VERSION:
+            return
+        frame = self.store.read()
+        if len(frame) != state["row_count"]:
+            # Rows written without their sync position (a crash in between):
+            # start from a full sync rather than append the same rows again
+            logger.warning("Snapshot %s does not match its sync state, resyncing", self.store.path)
+            return
+        self.header = state["header"]
+        self.row_count = state["row_count"]
+        self.tail = state["tail"]
+        self.as_of = state.get("as_of")
+        self.frame = frame
+        self._restore_views()
+        self.synced_at = time.monotonic()
+
+    def _restore_views(self):
+        # Views saved with the snapshot are loaded as they are; the others,
+        # or any saved at a different sync position, are rebuilt from the rows
+        stale = []
+        for kind, view in self.views.items():
+            arrays = self.store.load_arrays(kind.__name__) if hasattr(view, "from_arrays") else None
+            if arrays is not None and int(arrays.pop("rows")) == self.row_count:
+                view.from_arrays(arrays)
+            else:
+                stale.append(view)
+        with metrics.span("sheets.views"):
+            for view in stale:
+                view.rebuild(self.frame)
+
+    def _save_views(self):
+        for kind, view in self.views.items():
+            if hasattr(view, "to_arrays"):
+                self.store.save_arrays(kind.__name__, dict(view.to_arrays(), rows=self.row_count))
+
+    def _rebuild_views(self):
+        with metrics.span("sheets.views"):
+            for view in self.views.values():
+                view.rebuild(self.frame)
+
+    def _parse(self, frame):
+        if self.parse is None:
+            return frame
+        with metrics.span("sheets.parse"):
+            return self.parse(frame)
+
+    def _save_state(self):
+        if self.store is not None:
+            self.store.save_state({
+                "schema": schema.VERSION, "header": self.header,
+                "row_count": self.row_count, "tail": self.tail, "as_of": self.as_of,
+            })
+
+    def plan(self):
+        if (self.frame is None or not self.header
+                or time.monotonic() - self.synced_at > self.full_resync):
+            return [None]
+        # Row 1 is the header, data row n lives on sheet row n + 1
+        first = self.row_count + 1 if self.tail is not None else 2
+        return ["1:1", f"A{first}:{column_letter(len(self.header))}"]
+
+    def apply(self, plan, results):
+        # False when the tail check failed and a full sync is needed
+        if plan == [None]:
+            self._load_full(results[0])
+            return True
+
+        header_range, tail_range = results
+        header = list(header_range[0]) if header_range else []
+        if header != self.header:
+            return False
+
+        rows = list(tail_range)
+        if self.tail is not None:
+            if not rows or _pad(rows[0], len(self.header)) != self.tail:
+                return False
+            rows = rows[1:]
+
+        raw = _to_frame(self.header, rows)
+        if len(raw):
+            self.row_count += len(raw)
+            self.tail = list(raw.iloc[-1])
+            new_rows = self._parse(raw)
+            self.frame = schema.concat([self.frame, new_rows])
+            with metrics.span("sheets.views"):
+                for view in self.views.values():
+                    view.add(new_rows)
+            if self.store is not None:
+                self.store.append(new_rows)
+                self._save_views()
+        self.as_of = time.time()
+        self._save_state()
+        self.incremental_syncs += 1
+        return True
+
+    def _load_full(self, values):
+        self.header = list(values[0]) if values else []
+        raw = _to_frame(self.header, values[1:])
+        self.row_count = len(raw)
+        self.tail = list(raw.iloc[-1]) if len(raw) else None
+        self.frame = self._parse(raw)
+        self._rebuild_views()
+        self.as_of = time.time()
+        if self.store is not None:
+            self.store.write(self.frame)
+            self._save_views()
+            self._save_state()
+        self.synced_at = time.monotonic()
+        self.full_syncs += 1
+
+    def full_sync(self):
+        self.apply([None], self.fetch([None]))
+        return self.frame
+
+
+def _retryable(error):
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429 or (status is not None and status >= 500)
+
+
+def with_retry(call, *args, retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, **kwargs):
+    # Exponential backoff with jitter for quota (429) and transient 5xx errors
+    for attempt in range(retries + 1):
+        try:
+            return call(*args, **kwargs)
+        except gspread.exceptions.APIError as error:
+            if attempt == retries or not _retryable(error):
+                raise
+            time.sleep(backoff * 2 ** attempt * (1 + random.random()))
+
+
+class WorksheetCache:
+    """Per-worksheet DataFrame cache with TTL expiry and manual invalidation.
+
+    Expired worksheets requested together are read with a single
+    values_batchGet call, addressed by sheet name, so no per-worksheet
+    metadata request is needed.
+
+    With `background` on, a worksheet that already has data (in memory or in
+    its snapshot) is returned at once when expired and refreshed on a worker
+    thread; only a worksheet with no data at all is fetched while the caller
+    waits.
+    """
+
+    def __init__(self, spreadsheet, ttl=DEFAULT_TTL, ttls=None,
+                 append_only=APPEND_ONLY, full_resync=DEFAULT_FULL_RESYNC, snapshot_dir=None,
+                 retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, background=False):
+        self.spreadsheet = spreadsheet
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.append_only = tuple(append_only)
+        self.full_resync = full_resync
+        self.snapshot_dir = snapshot_dir
+        self.retries = retries
+        self.backoff = backoff
+        self.stores = {}
+        self._incremental = {}
+        self._views = {}  # name -> views of a sheet that is re-read whole
+        self._entries = {}  # name -> (fetched_at, DataFrame)
+        self._locks = {}
+        self._apply_locks = {}
+        self._guard = threading.Lock()
+        self.background = background
+        self.as_of = {}  # name -> wall-clock time of the data being served
+        self.errors = {}  # name -> (failed_at, error) of the last failed refresh
+        self._pending = set()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheets-refresh")
+
+    def _lock(self, name):
+        with self._guard:
+            return self._locks.setdefault(name, threading.Lock())
+
+    def _apply_lock(self, name):
+        # Held while a sync updates a worksheet's frame and views (not while it
+        # fetches), so a view and the frame it indexes can be read together
+        with self._guard:
+            return self._apply_locks.setdefault(name, threading.Lock())
+
+    def ttl_for(self, name):
+        return self.ttls.get(name, self.ttl)
+
+    def batch_fetch(self, requests):
+        # requests: [(worksheet name, A1 range or None for the whole sheet)]
+        ranges = [
+            gspread.utils.absolute_range_name(name, cells) if cells else gspread.utils.absolute_range_name(name)
+            for name, cells in requests
+        ]
+        with metrics.span("sheets.fetch"):
+            response = with_retry(
+                self.spreadsheet.values_batch_get, ranges, retries=self.retries, backoff=self.backoff
+            )
+        results = [value_range.get("values", []) for value_range in response.get("valueRanges", [])]
+        metrics.increment("sheets.batch_calls")
+        metrics.increment("sheets.cells", sum(len(row) for values in results for row in values))
+        return results
+
+    def store(self, name):
+        if self.snapshot_dir is None or name not in SNAPSHOTS:
+            return None
+        if name not in self.stores:
+            self.stores[name] = SnapshotStore(self.snapshot_dir, name, date_column=SNAPSHOTS[name])
+        return self.stores[name]
+
+    def incremental(self, name):
+        if name not in self._incremental:
+            self._incremental[name] = IncrementalSheet(
+                lambda ranges: self.batch_fetch([(name, cells) for cells in ranges]), self.full_resync,
+                store=self.store(name), parse=schema.PARSERS.get(name),
+                views=[view() for view in VIEWS.get(name, ())],
+            )
+        return self._incremental[name]
+
+    def _plan(self, name):
+        return self.incremental(name).plan() if name in self.append_only else [None]
+
+    def _apply(self, name, plan, results):
+        if name in self.append_only:
+            sheet = self.incremental(name)
+            if not sheet.apply(plan, results):
+                sheet.full_sync()
+            return sheet.frame
+        values = results[0]
+        frame = _to_frame(list(values[0]) if values else [], values[1:])
+        parse = schema.PARSERS.get(name)
+        if parse is not None:
+            with metrics.span("sheets.parse"):
+                frame = parse(frame)
+        views = self.views(name)
+        if views:
+            with metrics.span("sheets.views"):
+                for view in views.values():
+                    view.rebuild(frame)
+        return frame
+
+    def views(self, name):
+        # Derived views (VIEWS) of a worksheet: kept in step by the incremental
+        # sync of append-only sheets, rebuilt on every read of the others
+        if name in self.append_only:
+            return self.incremental(name).views
+        with self._guard:
+            if name not in self._views:
+                self._views[name] = {kind: kind() for kind in VIEWS.get(name, ())}
+            return self._views[name]
+
+    def _expired(self, name, ttl=None):
+        return (name not in self._entries
+                or time.monotonic() - self._entries[name][0] > (self.ttl_for(name) if ttl is None else ttl))
+
+    def _sync(self, names, ttl=None):
+        # One lock per worksheet, taken in name order: concurrent sessions wait
+        # for a single fetch instead of each pulling the same sheet.
+        locks = [self._lock(name) for name in names]
+        for lock in locks:
+            lock.acquire()
+        try:
+            expired = [name for name in names if self._expired(name, ttl)]
+            plans = {name: self._plan(name) for name in expired}
+            requests = [(name, cells) for name in expired for cells in plans[name]]
+            try:
+                results = self.batch_fetch(requests) if requests else []
+                position = 0
+                for name in expired:
+                    count = len(plans[name])
+                    with self._apply_lock(name):
+                        frame = self._apply(name, plans[name], results[position:position + count])
+                        self._entries[name] = (time.monotonic(), frame)
+                    position += count
+                    self.as_of[name] = time.time()
+                    self.errors.pop(name, None)
+            except Exception as error:
+                for name in expired:
+                    self.errors[name] = (time.monotonic(), error)
+                raise
+            return {name: self._entries[name][1] for name in names}
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+    def _restore(self, name):
+        # Serve the snapshot of an append-only sheet until the first refresh
+        if name in self._entries:
+            return True
+        if name not in self.append_only or self.store(name) is None:
+            return False
+        with self._lock(name):
+            sheet = self.incremental(name)
+            if name not in self._entries and sheet.frame is not None:
+                self._entries[name] = (float("-inf"), sheet.frame)
+                self.as_of[name] = sheet.as_of
+        return name in self._entries
+
+    def _refresh_later(self, names, ttl=None):
+        now = time.monotonic()
+        with self._guard:
+            names = [
+                name for name in names
+                if name not in self._pending
+                and not (name in self.errors and now - self.errors[name][0] < RETRY_AFTER)
+            ]
+            self._pending.update(names)
+        if names:
+            self._executor.submit(self._refresh_in_background, names, ttl)
+
+    def _refresh_in_background(self, names, ttl):
+        try:
+            self._sync(names, ttl)
+        except Exception as error:  # keep serving the last good data
+            logger.warning("Background refresh of %s failed: %s", ", ".join(names), error)
+        finally:
+            with self._guard:
+                self._pending.difference_update(names)
+
+    def refresh_many(self, names, ttl=None, block=None):
+        names = sorted(set(names))
+        if block is None:
+            block = not self.background
+        if block:
+            return self._sync(names, ttl)
+        missing = [name for name in names if not self._restore(name)]
+        if missing:
+            # Nothing to show yet, the caller has to wait for this one
+            self._sync(missing, ttl)
+        expired = [name for name in names if self._expired(name, ttl)]
+        if expired:
+            self._refresh_later(expired, ttl)
+        return {name: self._entries[name][1] for name in names}
+
+    def reload(self):
+        # Bring every cached worksheet up to date now, waiting for the fetch
+        # (still incremental for append-only sheets)
+        names = list(self._entries)
+        if names:
+            self._sync(names, ttl=0)
+
+    def refreshing(self, name):
+        return name in self._pending
+
+    def refresh(self, name, ttl=None, block=None):
+        return self.refresh_many([name], ttl=ttl, block=block)[name]
+
+    def view(self, name, kind, ttl=None):
+        self.refresh(name, ttl=ttl)
+        return self.views(name)[kind]
+
+    def get(self, name, ttl=None):
+        # Pages add derived columns, keep the cached frame untouched
+        return self.refresh(name, ttl=ttl).copy()
+
+    def view_rows(self, name, kind, ttl=None):
+        # A row index view and the frame its positions point into, from the
+        # same sync (a full resync may replace both in between two reads)
+        self.refresh(name, ttl=ttl)
+        with self._apply_lock(name):
+            return self.views(name)[kind], self._entries[name][1]
+
+
+def bot_sources():
+    # Optional [BOTS] section in secrets.toml, one table per bot spreadsheet:
+    #   [BOTS.pea_1129]
+    #   name = "PEA 1129"
+    #   google_sheet_key = "..."
+    # Without it the [GOOGLE_SHEETS] google_sheet_key is the only bot.
+    # Returns {bot id: display name} in configuration order.
+    bots = st.secrets.get("BOTS", {})
+    if not bots:
+        return {DEFAULT_BOT: "Bot"}
+    return {bot: settings.get("name", bot) for bot, settings in bots.items()}
+
+
+def _resolve(bot):
+    return next(iter(bot_sources())) if bot is None else bot
+
+
+@st.cache_resource(show_spinner=False)
+def _cache_for(bot):
+    if bot == DEFAULT_BOT:
+        key = st.secrets["GOOGLE_SHEETS"]["google_sheet_key"]
+    else:
+        key = st.secrets["BOTS"][bot]["google_sheet_key"]
+    settings = cache_settings()
+    if bot != DEFAULT_BOT and settings["snapshot_dir"] is not None:
+        settings["snapshot_dir"] = os.path.join(settings["snapshot_dir"], bot)
+    # Every bot shares the one authorized client
+    return WorksheetCache(get_spreadsheet(key), **settings)
+
+
+def get_cache(bot=None):
+    # One cache (and snapshot directory) per bot spreadsheet
+    return _cache_for(_resolve(bot))
+
+
+def _available(load, *args, **kwargs):
+    # Only reached without any local copy, e.g. the first start while Google
+    # Sheets is down; stop the page with a message instead of a traceback.
+    try:
+        return load(*args, **kwargs)
+    except Exception as error:
+        logger.warning("Loading from Google Sheets failed: %s", error)
+        st.error(f"Google Sheets is unavailable and no local copy of the data exists yet. ({error})")
+        st.stop()
+
+
+def load_sheet(name, ttl=None, bot=None):
+    return _available(get_cache(bot).get, name, ttl=ttl)
+
+
+def load_view(name, kind, ttl=None, bot=None):
+    return _available(get_cache(bot).view, name, kind, ttl=ttl)
+
+
+def load_view_rows(name, kind, ttl=None, bot=None):
+    # (view, frame); look rows up with frame.iloc[positions], no copy is made
+    return _available(get_cache(bot).view_rows, name, kind, ttl=ttl)
+
+
+_fleet_pool = ThreadPoolExecutor(max_workers=FLEET_WORKERS, thread_name_prefix="sheets-fleet")
+_merged = OrderedDict()  # (name, kind, (bot, version)...) -> merged view
+_merged_lock = threading.Lock()
+
+
+def for_fleet(call, bots):
+    # Run call(cache) for every bot at the same time, so a fleet loads in about
+    # the time of its slowest spreadsheet. Bots that fail are reported on the
+    # page and left out; the page stops only when none could be loaded.
+    # Workers record their spans and API counts into the page's rerun.
+    if len(bots) == 1:
+        futures = {bots[0]: None}
+    else:
+        call = metrics.bind(call)
+        futures = {bot: _fleet_pool.submit(call, get_cache(bot)) for bot in bots}
+    results, failed = {}, {}
+    for bot, future in futures.items():
+        try:
+            results[bot] = call(get_cache(bot)) if future is None else future.result()
+        except Exception as error:
+            logger.warning("Loading %s from Google Sheets failed: %s", bot, error)
+            failed[bot] = error
+    names = bot_sources()
+    if failed and not results:
+        st.error(f"Google Sheets is unavailable and no local copy of the data exists yet. ({next(iter(failed.values()))})")
+        st.stop()
+    for bot, error in failed.items():
+        st.warning(f"{names.get(bot, bot)}: Google Sheets is unavailable and no local copy exists yet. ({error})")
+    return results
+
+
+def sync_fleet(names, bots, ttl=None):
+    return for_fleet(lambda cache: cache.refresh_many(names, ttl=ttl), bots)
+
+
+def load_fleet_view(name, kind, bots, ttl=None):
+    # One view over the selected bots; views are merged with kind.merge and the
+    # result is reused until one of them changes
+    views = for_fleet(lambda cache: cache.view(name, kind, ttl=ttl), bots)
+    if len(views) == 1:
+        return next(iter(views.values()))
+    key = (name, kind, tuple((bot, view.version) for bot, view in views.items()))
+    with _merged_lock:
+        if key in _merged:
+            _merged.move_to_end(key)
+            return _merged[key]
+    merged = kind.merge(list(views.values()))
+    with _merged_lock:
+        _merged[key] = merged
+        while len(_merged) > FLEET_WORKERS:
+            _merged.popitem(last=False)
+    return merged
+
+
+def select_bots(label="Bots"):
+    # Sidebar choice of the bots to aggregate; no widget for a single bot
+    names = bot_sources()
+    if len(names) == 1:
+        return list(names)
+    return st.sidebar.multiselect(label, options=list(names), default=list(names), format_func=names.get) or list(names)
+
+
+def select_bot(label="Bot"):
+    names = bot_sources()
+    if len(names) == 1:
+        return next(iter(names))
+    return st.sidebar.selectbox(label, options=list(names), format_func=names.get)
+
+
+def data_status(*names, bots=None):
+    # "Data as of" note in the sidebar, with a warning while refreshes fail
+    caches = [get_cache(bot) for bot in (bots or [None])]
+    times = [cache.as_of.get(name) for cache in caches for name in names]
+    as_of = min(times) if times and None not in times else None
+    label = f"{datetime.fromtimestamp(as_of):%d/%m/%Y %H:%M:%S}" if as_of is not None else "an unknown time"
+    errors = [cache.errors[name][1] for cache in caches for name in names if name in cache.errors]
+    if errors:
+        st.sidebar.warning(f"Google Sheets is unreachable, showing data as of {label}. ({errors[0]})")
+    elif any(cache.refreshing(name) for cache in caches for name in names):
+        st.sidebar.caption(f"Data as of {label}, refreshing…")
+    else:
+        st.sidebar.caption(f"Data as of {label}")
+
+
+def _reload(cache):
+    try:
+        cache.reload()
+    except Exception as error:  # data_status shows it, the last data stays
+        logger.warning("Refreshing from Google Sheets failed: %s", error)
+
+
+def refresh_button(label="🔄 Refresh data"):
+    # Fetch every bot's cached worksheets before the page reads them, so the
+    # click's own rerun already shows the new rows
+    if st.sidebar.button(label):
+        with st.spinner("Refreshing from Google Sheets…"):
+            list(_fleet_pool.map(metrics.bind(_reload), [get_cache(bot) for bot in bot_sources()]))
@@ -0,0 +1,160 @@
+import json
+import os
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Local columnar copy of a worksheet, one Parquet file per `Date`.
+#   <root>/<name>/Date=2025-01-31/part.parquet
+#   <root>/<name>/Date=null/part.parquet   (rows without a date)
+#   <root>/<name>/_state.json   (sync position: header, row count, last raw row)
+#   <root>/<name>/_views/<View>.npz   (pre-aggregated views, saved as arrays)
+# Read back whole after a restart (memory-mapped), so pages no longer
+# download and re-parse the whole history on start-up; only the partitions
+# that receive rows are rewritten by an incremental sync.
+# Worksheets without a date column are stored as append chunks instead
+# (<root>/<name>/Chunk=000001/part.parquet), compacted into one file when
+# there are more than MAX_CHUNKS.
+
+DEFAULT_ROOT = os.path.join(".cache", "snapshots")
+CHUNK_PREFIX = "Chunk="
+MAX_CHUNKS = 64
+NULL_PARTITION = "null"
+
+
+class SnapshotStore:
+    def __init__(self, root, name, date_column="Date"):
+        self.path = os.path.join(root, name)
+        self.date_column = date_column
+        os.makedirs(self.path, exist_ok=True)
+
+    def _partition_file(self, day):
+        # day None: the rows whose date is missing
+        label = NULL_PARTITION if day is None else day.isoformat()
+        return os.path.join(self.path, f"{self.date_column}={label}", "part.parquet")
+
+    def _chunk_file(self, number):
+        return os.path.join(self.path, f"{CHUNK_PREFIX}{number:06d}", "part.parquet")
+
+    def chunks(self):
+        return sorted(
+            int(entry[len(CHUNK_PREFIX):]) for entry in os.listdir(self.path) if entry.startswith(CHUNK_PREFIX)
+        )
+
+    def _files(self):
+        if self.date_column is None:
+            return [self._chunk_file(number) for number in self.chunks()]
+        return [self._partition_file(day) for day in self._days()]
+
+    def _remove(self, path):
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+    def _write_file(self, path, table):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write then rename so readers never see a half-written partition
+        tmp_path = path + ".tmp"
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _replace_chunks(self, table):
+        for path in self._files():
+            self._remove(path)
+        self._write_file(self._chunk_file(1), table)
+
+    def dates(self):
+        if self.date_column is None:
+            return []
+        prefix = f"{self.date_column}="
+        days = [
+            date.fromisoformat(entry[len(prefix):])
+            for entry in os.listdir(self.path)
+            if entry.startswith(prefix) and entry != prefix + NULL_PARTITION
+        ]
+        return sorted(days)
+
+    def _days(self):
+        # Dates with a partition, then None for the null partition if any
+        has_null = os.path.exists(self._partition_file(None))
+        return self.dates() + ([None] if has_null else [])
+
+    def _partitions(self, frame):
+        for day, part in frame.groupby(self.date_column, sort=True, observed=True):
+            yield pd.Timestamp(day).date(), part
+        missing = frame[self.date_column].isna()
+        if missing.any():
+            yield None, frame[missing]
+
+    def write(self, frame):
+        # Full rewrite: replace every partition and drop the ones that vanished
+        if self.date_column is None:
+            self._replace_chunks(pa.Table.from_pandas(frame, preserve_index=False))
+            return
+        stale = set(self._days())
+        for day, part in self._partitions(frame):
+            self._write_file(self._partition_file(day), pa.Table.from_pandas(part, preserve_index=False))
+            stale.discard(day)
+        for day in stale:
+            self._remove(self._partition_file(day))
+
+    def append(self, frame):
+        # Only the partitions that received rows are rewritten (normally today's)
+        if self.date_column is None:
+            chunks = self.chunks()
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+            if len(chunks) >= MAX_CHUNKS:
+                tables = [pq.read_table(path, memory_map=True) for path in self._files()]
+                self._replace_chunks(pa.concat_tables(tables + [table], promote_options="permissive"))
+            else:
+                self._write_file(self._chunk_file(chunks[-1] + 1 if chunks else 1), table)
+            return
+        for day, part in self._partitions(frame):
+            path = self._partition_file(day)
+            table = pa.Table.from_pandas(part, preserve_index=False)
+            if os.path.exists(path):
+                existing = pq.read_table(path, memory_map=True)
+                table = pa.concat_tables([existing, table.cast(existing.schema)])
+            self._write_file(path, table)
+
+    def read(self):
+        # The whole snapshot, memory-mapped, as one frame (dated partitions in
+        # date order, then the rows without a date)
+        tables = [pq.read_table(path, memory_map=True) for path in self._files()]
+        if not tables:
+            return pd.DataFrame()
+        return pa.concat_tables(tables, promote_options="default").to_pandas()
+
+    def load_state(self):
+        path = os.path.join(self.path, "_state.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_state(self, state):
+        path = os.path.join(self.path, "_state.json")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def _arrays_file(self, key):
+        return os.path.join(self.path, "_views", f"{key}.npz")
+
+    def save_arrays(self, key, arrays):
+        path = self._arrays_file(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    def load_arrays(self, key):
+        path = self._arrays_file(key)
+        if not os.path.exists(path):
+            return None
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+import schema
+import sheets
+from aggregates import IntervalCube
+from benchmarks import synthetic
+from benchmarks.fake_sheets import FakeSpreadsheet
+
+# Incremental sync of "Daily" against the in-process fake of gspread: new rows
+# are fetched as a tail, anything else that changed the sheet falls back to a
+# full sync, and the interval cube always matches one built from scratch.
+
+ROWS = 1_200
+
+
+def daily_sheet(rows=ROWS, seed=0):
+    return FakeSpreadsheet({"Daily": synthetic.daily_values(rows, seed)})
+
+
+def new_cache(spreadsheet, snapshot_dir=None):
+    return sheets.WorksheetCache(spreadsheet, ttl=0, snapshot_dir=snapshot_dir)
+
+
+def expected_counts(values):
+    cube = IntervalCube()
+    cube.rebuild(schema.parse_daily(sheets._to_frame(values[0], values[1:])))
+    return cube.select()[2]
+
+
+def check(cache, spreadsheet, full_syncs, incremental_syncs):
+    values = spreadsheet.worksheet("Daily").values
+    frame = cache.refresh("Daily")
+    sheet = cache.incremental("Daily")
+    assert len(frame) == len(values) - 1
+    assert (sheet.full_syncs, sheet.incremental_syncs) == (full_syncs, incremental_syncs)
+    counts = sheet.views[IntervalCube].select()[2]
+    assert counts.sum() == len(frame)
+    np.testing.assert_array_equal(counts, expected_counts(values))
+
+
+@pytest.fixture
+def synced():
+    spreadsheet = daily_sheet()
+    cache = new_cache(spreadsheet)
+    check(cache, spreadsheet, full_syncs=1, incremental_syncs=0)
+    return cache, spreadsheet
+
+
+def test_appended_rows_are_fetched_as_a_tail(synced):
+    cache, spreadsheet = synced
+    spreadsheet.worksheet("Daily").append_rows(synthetic.daily_values(50, seed=1)[1:])
+    spreadsheet.stats.clear()
+    check(cache, spreadsheet, full_syncs=1, incremental_syncs=1)
+    assert spreadsheet.stats["cells"] < 3 * 60
+
+
+def test_no_new_rows_is_an_incremental_sync(synced):
+    cache, spreadsheet = synced
+    check(cache, spreadsheet, full_syncs=1, incremental_syncs=1)
+
+
+def test_edited_last_row_forces_a_full_sync(synced):
+    cache, spreadsheet = synced
+    spreadsheet.worksheet("Daily").values[-1][2] = "Supervisor" if spreadsheet.worksheet("Daily").values[-1][2] == "Bot" else "Bot"
+    check(cache, spreadsheet, full_syncs=2, incremental_syncs=0)
+
+
+def test_deleted_row_forces_a_full_sync(synced):
+    cache, spreadsheet = synced
+    del spreadsheet.worksheet("Daily").values[10]
+    check(cache, spreadsheet, full_syncs=2, incremental_syncs=0)
+
+
+def test_deleted_row_with_new_rows_forces_a_full_sync(synced):
+    cache, spreadsheet = synced
+    worksheet = spreadsheet.worksheet("Daily")
+    del worksheet.values[10]
+    worksheet.append_rows(synthetic.daily_values(5, seed=2)[1:])
+    check(cache, spreadsheet, full_syncs=2, incremental_syncs=0)
+
+
+def test_changed_header_forces_a_full_sync(synced):
+    cache, spreadsheet = synced
+    spreadsheet.worksheet("Daily").values[0] = ["Ticket No.", "Created", "Response", "Note"]
+    check(cache, spreadsheet, full_syncs=2, incremental_syncs=0)
+    assert list(cache.incremental("Daily").header) == ["Ticket No.", "Created", "Response", "Note"]
+
+
+def test_empty_sheet_then_rows():
+    spreadsheet = FakeSpreadsheet({"Daily": []})
+    cache = new_cache(spreadsheet)
+    assert cache.refresh("Daily").empty
+    assert cache.incremental("Daily").views[IntervalCube].select()[2].sum() == 0
+
+    spreadsheet.worksheet("Daily").values.extend(synthetic.daily_values(100))
+    check(cache, spreadsheet, full_syncs=2, incremental_syncs=0)
+
+
+def test_header_only_sheet_then_rows():
+    spreadsheet = daily_sheet(rows=0)
+    del spreadsheet.worksheet("Daily").values[1:]
+    cache = new_cache(spreadsheet)
+    check(cache, spreadsheet, full_syncs=1, incremental_syncs=0)
+
+    spreadsheet.worksheet("Daily").append_rows(synthetic.daily_values(100)[1:])
+    check(cache, spreadsheet, full_syncs=1, incremental_syncs=1)
+
+
+def test_snapshot_restore_then_incremental_sync(synced, tmp_path):
+    _, spreadsheet = synced
+    new_cache(spreadsheet, snapshot_dir=tmp_path).refresh("Daily")
+
+    spreadsheet.worksheet("Daily").append_rows(synthetic.daily_values(50, seed=3)[1:])
+    restarted = new_cache(spreadsheet, snapshot_dir=tmp_path)
+    assert len(restarted.incremental("Daily").frame) == ROWS
+    check(restarted, spreadsheet, full_syncs=0, incremental_syncs=1)
+
+
+def test_snapshot_keeps_rows_without_a_date(tmp_path):
+    spreadsheet = daily_sheet()
+    spreadsheet.worksheet("Daily").values[5][1] = "not a date"
+    new_cache(spreadsheet, snapshot_dir=tmp_path).refresh("Daily")
+
+    restarted = new_cache(spreadsheet, snapshot_dir=tmp_path)
+    frame = restarted.refresh("Daily")
+    assert len(frame) == ROWS
+    assert frame["Date"].isna().sum() == 1
+    assert restarted.incremental("Daily").full_syncs == 0
+
+
+def test_views_of_a_sheet_read_whole():
+    spreadsheet = daily_sheet()
+    cache = sheets.WorksheetCache(spreadsheet, ttl=0, append_only=())
+    cache.refresh("Daily")
+    spreadsheet.worksheet("Daily").append_rows(synthetic.daily_values(50, seed=4)[1:])
+    counts = cache.view("Daily", IntervalCube).select()[2]
+    np.testing.assert_array_equal(counts, expected_counts(spreadsheet.worksheet("Daily").values))
@@ -0,0 +1,33 @@
+import itertools
+
+import pandas as pd
+
+import reasons
+import schema
+
+# Every combination of the step flags against the reason the supervisor sees.
+# Only Yes/Yes/Yes differs from the original per-row set_reason, which showed
+# "SendVOC pending" for it.
+
+VALUES = ["Yes", "No", ""]
+
+
+def expected_code(delete, sms, voc):
+    if delete == "No":
+        return "NOT_ELIGIBLE"
+    if delete == "Yes" and sms == "No":
+        return "DELETED_ONLY"
+    if delete == "Yes" and sms == "Yes":
+        return "ALL_STEPS_DONE" if voc == "Yes" else "SMS_SENT"
+    return reasons.UNKNOWN
+
+
+def test_every_step_state_gets_its_reason():
+    states = list(itertools.product(VALUES, repeat=3))
+    frame = schema.parse_logdata(pd.DataFrame(states, columns=reasons.STEP_COLUMNS))
+    codes = reasons.classify(frame)
+    assert list(codes) == [expected_code(*state) for state in states]
+
+    messages = reasons.reason_messages(frame)
+    for state, message in zip(states, messages):
+        assert message == reasons.MESSAGES["th"][expected_code(*state)]
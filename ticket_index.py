@@ -0,0 +1,136 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+# Row positions of "Logdata" by ticket and by bot run start, so looking up a
+# ticket's history or the rows of a time window never scans the sheet. The
+# positions point into the cached Logdata frame, which only grows between
+# full syncs; a full sync rebuilds the index.
+
+_versions = itertools.count(1)
+
+
+def _empty_index():
+    # Swapped as one tuple so readers never slice new arrays with old offsets:
+    #   code_of        ticket -> code
+    #   codes          code per row, -1 without a ticket
+    #   grouped        row positions grouped by code
+    #   offsets        code -> slice of grouped
+    #   compacted      rows covered by grouped
+    #   starts         run start per row
+    #   order          row positions sorted by run start
+    #   sorted_starts  starts[order]
+    return (
+        {}, np.array([], dtype=np.int64), np.array([], dtype=np.int64), np.zeros(1, dtype=np.int64), 0,
+        np.array([], dtype='datetime64[s]'), np.array([], dtype=np.int64), np.array([], dtype='datetime64[s]'),
+    )
+
+
+class TicketIndex:
+    """Hash index on `Ticket No.` plus a sorted index on run start.
+
+    Tickets map to integer codes; rows are grouped by code in one sorted
+    array (CSR style) when the index is built. Rows added later are found by
+    scanning the short tail, which is folded into the grouped array once it
+    grows past COMPACT_AFTER rows.
+    """
+
+    COMPACT_AFTER = 50_000
+
+    def __init__(self, ticket_column='Ticket No.'):
+        self.ticket_column = ticket_column
+        self._state = _empty_index()
+        self.version = next(_versions)
+
+    def rebuild(self, frame):
+        # Built aside and published once: readers keep the old index meanwhile
+        self._state = self._added(_empty_index(), frame)
+        self.version = next(_versions)
+
+    def add(self, frame):
+        # Callers serialize writers (one sync per worksheet at a time)
+        if len(frame):
+            self._state = self._added(self._state, frame)
+            self.version = next(_versions)
+
+    @staticmethod
+    def _encode(code_of, tickets):
+        if not code_of:
+            codes, uniques = pd.factorize(tickets)
+            return dict(zip(uniques, range(len(uniques)))), codes.astype(np.int64)
+        # Only ever grows: a reader of the previous state may see new tickets,
+        # whose codes are past its offsets and absent from its codes
+        for ticket in pd.unique(tickets.dropna()):
+            code_of.setdefault(ticket, len(code_of))
+        return code_of, np.fromiter(
+            (code_of.get(ticket, -1) for ticket in tickets.fillna('')), dtype=np.int64, count=len(tickets)
+        )
+
+    @staticmethod
+    def _group(code_of, codes):
+        order = np.argsort(codes, kind='stable')
+        grouped = order[np.count_nonzero(codes < 0):]
+        offsets = np.concatenate([[0], np.cumsum(np.bincount(codes[codes >= 0], minlength=len(code_of)))])
+        return grouped, offsets
+
+    def _added(self, state, frame):
+        code_of, codes, grouped, offsets, compacted, starts, order, sorted_starts = state
+        rows = len(codes)
+        positions = np.arange(rows, rows + len(frame))
+        code_of, new_codes = self._encode(code_of, frame[self.ticket_column])
+        codes = np.concatenate([codes, new_codes])
+
+        new_starts = schema.run_start(frame).to_numpy().astype('datetime64[s]')
+        new_order = positions[np.argsort(new_starts, kind='stable')]
+        starts = np.concatenate([starts, new_starts])
+        # NaT sorts last: compare real starts only, and keep NaT rows at the end
+        real = np.count_nonzero(~np.isnat(sorted_starts))
+        new_real = np.count_nonzero(~np.isnat(new_starts))
+        if real and new_real and starts[new_order[0]] < sorted_starts[real - 1]:
+            # Rows of an earlier run arrived late, re-sort everything
+            order = np.argsort(starts, kind='stable')
+        else:
+            order = np.concatenate([order[:real], new_order[:new_real], order[real:], new_order[new_real:]])
+        if len(codes) - compacted > self.COMPACT_AFTER or not compacted:
+            grouped, offsets = self._group(code_of, codes)
+            compacted = len(codes)
+        return code_of, codes, grouped, offsets, compacted, starts, order, starts[order]
+
+    def __len__(self):
+        return len(self._state[1])
+
+    def __contains__(self, ticket):
+        return ticket in self._state[0]
+
+    def positions(self, ticket):
+        # Rows of one ticket, oldest run first
+        code_of, codes, grouped, offsets, compacted, starts, _, _ = self._state
+        code = code_of.get(ticket)
+        if code is None:
+            return np.array([], dtype=np.int64)
+        found = grouped[offsets[code]:offsets[code + 1]] if code + 1 < len(offsets) else []
+        tail = compacted + np.flatnonzero(codes[compacted:] == code)
+        found = np.concatenate([found, tail]).astype(np.int64)
+        return found[np.argsort(starts[found], kind='stable')]
+
+    def between(self, start=None, end=None):
+        # Rows whose run started in [start, end), oldest first
+        *_, order, starts = self._state
+        first = 0 if start is None else np.searchsorted(starts, np.datetime64(start, 's'))
+        last = len(starts) if end is None else np.searchsorted(starts, np.datetime64(end, 's'))
+        return order[first:last]
+
+    def undated(self):
+        # Rows whose run start is missing or did not parse (kept last in order)
+        *_, order, starts = self._state
+        return order[np.count_nonzero(~np.isnat(starts)):]
+
+    def date_range(self):
+        starts = self._state[5]
+        starts = starts[~np.isnat(starts)]
+        if not len(starts):
+            return None, None
+        return starts.min().item().date(), starts.max().item().date()